@@ -24,13 +24,22 @@ Autor: ChatGPT
 
 from __future__ import annotations
 
+import asyncio
+import csv
 import hashlib
+import logging
+import logging.handlers
 import os
 import sys
 import sqlite3
+import threading
 from datetime import datetime, date, time, timedelta
 import secrets
 import json
+import queue
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from time import monotonic
 
 # Import du service de stockage d'images ImgBB
 # Ajouter le répertoire courant au path pour s'assurer que l'import fonctionne
@@ -49,14 +58,28 @@ except ImportError as e:
         return {'status': 'error', 'message': 'Service d\'upload d\'images non disponible', 'imgbb_working': False}
 from typing import Optional, List, Dict, Any, Tuple
 from pathlib import Path
+from database import (
+    execute as db_execute, execute_write as db_execute_write, execute_many as db_execute_many,
+    placeholders as sql_placeholders, get_db_connection as get_db_conn, hash_password as hash_pwd,
+    init_db, ensure_indexes,
+)
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 
-from fastapi import FastAPI, Request, Depends, HTTPException
-from fastapi.responses import RedirectResponse, HTMLResponse, FileResponse, JSONResponse, Response
+from fastapi import FastAPI, Request, Depends, HTTPException, BackgroundTasks
+from starlette.datastructures import UploadFile
+from fastapi.responses import RedirectResponse, HTMLResponse, JSONResponse, Response, StreamingResponse
+
+# Sérialisation JSON rapide avec orjson si disponible, sinon json standard
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    orjson = None
+    FastJSONResponse = JSONResponse
 from fastapi.staticfiles import StaticFiles
 import urllib.parse
 from fastapi.templating import Jinja2Templates
@@ -64,14 +87,79 @@ import base64
 import hmac
 import re
 import uuid
-from io import BytesIO
+from io import BytesIO, StringIO
 import json
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "database.db")
 
-app = FastAPI()
+# Journalisation : les messages sont déposés dans une file et écrits sur la
+# sortie standard par un thread dédié, pour ne jamais bloquer les requêtes
+log = logging.getLogger(__name__)
+log.setLevel(logging.INFO)
+if not log.handlers:
+    _log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    log.addHandler(logging.handlers.QueueHandler(_log_queue))
+    log.propagate = False
+    _log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+    _log_listener.start()
+
+
+def to_json(value: Any) -> str:
+    """Sérialise une valeur en texte JSON (orjson si disponible), pour l'injecter dans un template."""
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value)
+
+
+class TTLCache:
+    """Petit cache clé/valeur en mémoire, borné en taille (LRU) et en durée de vie.
+
+    Les accès sont protégés par un verrou : le cache est aussi lu et invalidé
+    depuis les fonctions exécutées dans des threads (asyncio.to_thread).
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if monotonic() >= expires_at:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Any) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def keys(self) -> List[Any]:
+        with self._lock:
+            return list(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+# Les routes qui retournent directement un dict/list sont sérialisées avec orjson si disponible
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Middleware pour la gestion des sessions sécurisées
 @app.middleware("http")
@@ -125,6 +213,9 @@ SMTP_USERNAME = os.getenv("SMTP_USERNAME", "")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
 EMAIL_FROM = os.getenv("EMAIL_FROM", "noreply@cmtch.tn")
 
+# Mode développement (CMTCH_DEBUG=1) : templates rechargés à chaque modification
+DEBUG = os.getenv("CMTCH_DEBUG", "") == "1"
+
 def detect_language(text: str) -> str:
     """
     Détecte la langue d'un texte (arabe ou français)
@@ -160,6 +251,8 @@ def get_text_align(language: str) -> str:
     return 'right' if language == 'ar' else 'left'
 
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
+# En production les templates compilés restent en cache sans vérifier la date des fichiers
+templates.env.auto_reload = DEBUG
 # Expose l'objet datetime dans les templates pour afficher l'année dans le pied de page
 templates.env.globals["datetime"] = datetime
 # Expose les fonctions de détection de langue dans les templates
@@ -239,18 +332,10 @@ def create_secure_session_token(user_id: int, ip_address: str = None, user_agent
     # Enregistrer la session en base de données
     conn = get_db_connection()
     try:
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur = conn.cursor()
-            cur.execute("""
-                INSERT INTO user_sessions (user_id, session_token, expires_at, last_activity, ip_address, user_agent)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (user_id, token, expires_at.isoformat(), now.isoformat(), ip_address, user_agent))
-        else:
-            cur = conn.cursor()
-            cur.execute("""
-                INSERT INTO user_sessions (user_id, session_token, expires_at, last_activity, ip_address, user_agent)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (user_id, token, expires_at.isoformat(), now.isoformat(), ip_address, user_agent))
+        db_execute_write(conn, """
+            INSERT INTO user_sessions (user_id, session_token, expires_at, last_activity, ip_address, user_agent)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (user_id, token, expires_at.isoformat(), now.isoformat(), ip_address, user_agent))
         
         conn.commit()
         return token
@@ -281,26 +366,17 @@ def validate_session_token(token: str, ip_address: str = None) -> Optional[int]:
     
     conn = get_db_connection()
     try:
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT user_id, expires_at, last_activity, is_active, ip_address
-                FROM user_sessions 
-                WHERE session_token = %s AND is_active = 1
-            """, (token,))
-        else:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT user_id, expires_at, last_activity, is_active, ip_address
-                FROM user_sessions 
-                WHERE session_token = ? AND is_active = 1
-            """, (token,))
+        rows, _ = db_execute(conn, """
+            SELECT user_id, expires_at, last_activity, is_active, ip_address
+            FROM user_sessions 
+            WHERE session_token = ? AND is_active = 1
+        """, (token,))
         
-        session = cur.fetchone()
-        if not session:
+        if not rows:
             return None
         
-        user_id, expires_at_str, last_activity_str, is_active, session_ip = session
+        session = rows[0]
+        user_id, expires_at_str, last_activity_str = session.user_id, session.expires_at, session.last_activity
         
         # Vérifier si la session est expirée
         try:
@@ -343,20 +419,11 @@ def update_session_activity(token: str) -> None:
     """Met à jour la dernière activité d'une session."""
     conn = get_db_connection()
     try:
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur = conn.cursor()
-            cur.execute("""
-                UPDATE user_sessions 
-                SET last_activity = %s 
-                WHERE session_token = %s
-            """, (datetime.now().isoformat(), token))
-        else:
-            cur = conn.cursor()
-            cur.execute("""
-                UPDATE user_sessions 
-                SET last_activity = ? 
-                WHERE session_token = ?
-            """, (datetime.now().isoformat(), token))
+        db_execute_write(conn, """
+            UPDATE user_sessions 
+            SET last_activity = ? 
+            WHERE session_token = ?
+        """, (datetime.now().isoformat(), token))
         
         conn.commit()
     finally:
@@ -365,22 +432,14 @@ def update_session_activity(token: str) -> None:
 
 def deactivate_session(token: str) -> None:
     """Désactive une session."""
+    _current_user_cache.pop(token)
     conn = get_db_connection()
     try:
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur = conn.cursor()
-            cur.execute("""
-                UPDATE user_sessions 
-                SET is_active = 0 
-                WHERE session_token = %s
-            """, (token,))
-        else:
-            cur = conn.cursor()
-            cur.execute("""
-                UPDATE user_sessions 
-                SET is_active = 0 
-                WHERE session_token = ?
-            """, (token,))
+        db_execute_write(conn, """
+            UPDATE user_sessions 
+            SET is_active = 0 
+            WHERE session_token = ?
+        """, (token,))
         
         conn.commit()
     finally:
@@ -392,20 +451,11 @@ def cleanup_expired_sessions() -> None:
     conn = get_db_connection()
     try:
         now = datetime.now().isoformat()
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur = conn.cursor()
-            cur.execute("""
-                UPDATE user_sessions 
-                SET is_active = 0 
-                WHERE expires_at < %s OR last_activity < %s
-            """, (now, (datetime.now() - timedelta(minutes=SESSION_TIMEOUT_MINUTES)).isoformat()))
-        else:
-            cur = conn.cursor()
-            cur.execute("""
-                UPDATE user_sessions 
-                SET is_active = 0 
-                WHERE expires_at < ? OR last_activity < ?
-            """, (now, (datetime.now() - timedelta(minutes=SESSION_TIMEOUT_MINUTES)).isoformat()))
+        db_execute_write(conn, """
+            UPDATE user_sessions 
+            SET is_active = 0 
+            WHERE expires_at < ? OR last_activity < ?
+        """, (now, (datetime.now() - timedelta(minutes=SESSION_TIMEOUT_MINUTES)).isoformat()))
         
         conn.commit()
     finally:
@@ -416,25 +466,17 @@ def should_refresh_token(token: str) -> bool:
     """Vérifie si un token doit être rafraîchi."""
     conn = get_db_connection()
     try:
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT expires_at FROM user_sessions 
-                WHERE session_token = %s AND is_active = 1
-            """, (token,))
-        else:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT expires_at FROM user_sessions 
-                WHERE session_token = ? AND is_active = 1
-            """, (token,))
+        rows, _ = db_execute(conn, """
+            SELECT expires_at FROM user_sessions 
+            WHERE session_token = ? AND is_active = 1
+        """, (token,))
         
-        result = cur.fetchone()
-        if not result:
+        if not rows:
             return False
         
         try:
-            expires_at = datetime.fromisoformat(str(result[0])) if result[0] else datetime.now()
+            expires_at_str = rows[0].expires_at
+            expires_at = datetime.fromisoformat(str(expires_at_str)) if expires_at_str else datetime.now()
             refresh_threshold = datetime.now() + timedelta(minutes=SESSION_REFRESH_THRESHOLD)
             
             return datetime.now() < refresh_threshold < expires_at
@@ -490,68 +532,195 @@ def parse_session_token(token: Optional[str]) -> Optional[int]:
 
 
 
+DAY_NAMES = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
+MONTH_NAMES = [
+    "Janvier", "Février", "Mars", "Avril", "Mai", "Juin",
+    "Juillet", "Août", "Septembre", "Octobre", "Novembre", "Décembre"
+]
+
+
+@lru_cache(maxsize=1)
+def build_time_slots() -> Tuple[Tuple[str, str], ...]:
+    """Retourne les créneaux horaires d'une heure proposés à la réservation (6h-23h)."""
+    time_slots = []
+    for hour in range(6, 23):
+        start_slot = time(hour, 0)
+        end_slot = time(hour + 1, 0) if hour < 22 else time(23, 0)
+        time_slots.append((start_slot.strftime("%H:%M"), end_slot.strftime("%H:%M")))
+    return tuple(time_slots)
+
+
+@lru_cache(maxsize=1)
+def build_slot_minutes() -> Tuple[Tuple[int, int], ...]:
+    """Retourne les bornes des créneaux horaires en minutes depuis minuit."""
+    return tuple(
+        (time_to_minutes(start_str), time_to_minutes(end_str)) for start_str, end_str in build_time_slots()
+    )
+
+
+@lru_cache(maxsize=64)
+def build_week_dates(week_start: date) -> Tuple[dict, ...]:
+    """Retourne les 7 jours de la semaine commençant au lundi donné, avec leur nom."""
+    week_dates = []
+    for offset in range(7):
+        current_date = week_start + timedelta(days=offset)
+        week_dates.append({
+            "date": current_date.isoformat(),
+            "day_name": DAY_NAMES[current_date.weekday()],
+            "day_number": current_date.day
+        })
+    return tuple(week_dates)
+
+
+@lru_cache(maxsize=64)
+def build_month_skeleton(year: int, month: int) -> Tuple[Tuple[dict, ...], str]:
+    """Retourne la grille du calendrier mensuel (semaines complètes) et son titre.
+
+    Les grilles sont mémorisées : elles ne dépendent que de l'année et du mois.
+    """
+    month_start = date(year, month, 1)
+    month_title = f"{MONTH_NAMES[month - 1]} {year}"
+    
+    # Trouver le dernier jour du mois
+    if month == 12:
+        month_end = date(year + 1, 1, 1) - timedelta(days=1)
+    else:
+        month_end = date(year, month + 1, 1) - timedelta(days=1)
+    
+    # Compléter la première et la dernière semaine avec les mois voisins
+    grid_start = month_start - timedelta(days=month_start.weekday())
+    grid_end = month_end + timedelta(days=6 - month_end.weekday())
+    
+    month_dates = []
+    current_date = grid_start
+    while current_date <= grid_end:
+        month_dates.append({
+            "date": current_date.isoformat(),
+            "day_number": current_date.day,
+            "is_current_month": current_date.month == month
+        })
+        current_date += timedelta(days=1)
+    return tuple(month_dates), month_title
+
+
+# Fréquences acceptées pour une réservation récurrente
+RECURRING_FREQUENCIES = ("weekly", "biweekly", "monthly")
+# Nombre maximal d'occurrences générées pour une réservation récurrente
+MAX_RECURRING_OCCURRENCES = 120
+
+
+def expand_recurrence(start: date, end: date, frequency: str) -> List[date]:
+    """Retourne les dates d'une récurrence (weekly, biweekly ou monthly) entre deux dates incluses."""
+    occurrences: List[date] = []
+    current = start
+    index = 0
+    while current <= end and len(occurrences) < MAX_RECURRING_OCCURRENCES:
+        occurrences.append(current)
+        index += 1
+        if frequency == "monthly":
+            # Même jour du mois suivant, ramené au dernier jour si le mois est plus court
+            month_index = start.month - 1 + index
+            year, month = start.year + month_index // 12, month_index % 12 + 1
+            next_month_start = date(year + (month == 12), month % 12 + 1, 1)
+            current = date(year, month, min(start.day, (next_month_start - timedelta(days=1)).day))
+        else:
+            current = start + timedelta(days=(14 if frequency == "biweekly" else 7) * index)
+    return occurrences
+
+
+def validate_reservation_slot(
+    court_number_raw: str, start_time: str, end_time: str, *date_fields: str
+) -> Tuple[Optional[int], List[date], List[str]]:
+    """Valide le court, les heures (HH:MM) et les dates (AAAA-MM-JJ) d'une réservation.
+
+    Returns:
+        Le numéro de court (ou None), les dates converties et la liste des
+        messages d'erreur, vide si le créneau est valide.
+    """
+    try:
+        court_number: Optional[int] = int(court_number_raw)
+    except (ValueError, TypeError):
+        court_number = None
+    errors: List[str] = []
+    dates: List[date] = []
+    try:
+        dates = [datetime.strptime(value, "%Y-%m-%d").date() for value in date_fields]
+        start = datetime.strptime(start_time, "%H:%M").time()
+        end = datetime.strptime(end_time, "%H:%M").time()
+        if start >= end:
+            errors.append("L'heure de fin doit être postérieure à l'heure de début.")
+    except ValueError:
+        errors.append("Format de date ou d'heure invalide.")
+    if court_number not in (1, 2, 3):
+        errors.append("Numéro de court invalide.")
+    return court_number, dates, errors
+
+
+def time_to_minutes(value: Any) -> int:
+    """Convertit une heure de réservation ('HH:MM', time ou timedelta MySQL) en minutes."""
+    if hasattr(value, 'total_seconds'):
+        return int(value.total_seconds()) // 60
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    hours, minutes = str(value).split(':')[:2]
+    return int(hours) * 60 + int(minutes)
+
+
 def verify_password(password: str, password_hash: str) -> bool:
     """Vérifie qu'un mot de passe correspond à une empreinte enregistrée."""
-    from database import hash_password as hash_pwd
     return hash_pwd(password) == password_hash
 
 
-# Utilitaire pour analyser les formulaires multipart/form-data sans dépendance
-def parse_multipart_form(body: bytes, content_type: str) -> Dict[str, Any]:
-    """Parse un corps multipart/form-data et retourne un dict des champs.
+# Image utilisée lorsque l'envoi vers ImgBB échoue
+DEFAULT_ARTICLE_IMAGE_URL = "https://i.ibb.co/8nBCWmhf/test-image-png.png"
 
-    Cette fonction analyse les données envoyées dans le corps d'une requête
-    multipart/form-data. Les champs simples (texte) sont retournés comme des
-    chaînes de caractères. Les champs de fichier sont retournés sous la forme
-    d'un dictionnaire avec les clés 'filename' et 'content' (contenu binaire).
 
-    Args:
-        body: corps brut de la requête en bytes.
-        content_type: valeur de l'en-tête Content-Type (avec le boundary).
+async def read_article_form(request: Request) -> Tuple[str, str, str, bool]:
+    """Lit le formulaire de création ou de modification d'un article.
+
+    Deux types de formulaires sont acceptés :
+    - `multipart/form-data` avec un champ fichier `image_file`, envoyé vers ImgBB ;
+    - `application/x-www-form-urlencoded` avec un champ `image_url`.
+
+    Le corps est analysé par request.form() : les fichiers volumineux sont
+    stockés dans un fichier temporaire plutôt qu'entièrement en mémoire.
 
     Returns:
-        Un dictionnaire où les clés sont les noms de champs.
+        Tuple (titre, contenu, chemin de l'image, formulaire multipart ou non).
     """
-    result: Dict[str, Any] = {}
-    # Extraire le boundary depuis le header
-    m = re.search(r"boundary=([^;]+)", content_type)
-    if not m:
-        return result
-    boundary = m.group(1)
-    # Les guillemets autour du boundary sont supprimés le cas échéant
-    if boundary.startswith('"') and boundary.endswith('"'):
-        boundary = boundary[1:-1]
-    boundary_bytes = ('--' + boundary).encode()
-    parts = body.split(boundary_bytes)
-    # On ignore la première et la dernière partie (avant le premier boundary et après le boundary de fermeture)
-    for part in parts[1:-1]:
-        part = part.strip(b"\r\n")
-        if not part:
-            continue
-        # Séparer les entêtes du contenu
-        header_block, _, data = part.partition(b"\r\n\r\n")
-        headers: Dict[str, str] = {}
-        for header_line in header_block.split(b"\r\n"):
-            try:
-                key, _, value = header_line.decode(errors="replace").partition(":")
-                headers[key.strip().lower()] = value.strip()
-            except Exception:
-                continue
-        content_disp = headers.get('content-disposition', '')
-        # Extraire les paramètres du Content-Disposition
-        disp_params = dict(re.findall(r'([^;=\s]+)="?([^";]*)"?', content_disp))
-        field_name = disp_params.get('name')
-        filename = disp_params.get('filename')
-        # Nettoyer le contenu (supprimer le CRLF final)
-        cleaned = data.rstrip(b"\r\n")
-        if filename:
-            result[field_name] = {"filename": filename, "content": cleaned}
-        else:
+    is_multipart = "multipart/form-data" in request.headers.get("content-type", "")
+    form = await request.form()
+    title = str(form.get("title", "")).strip()
+    content_text = str(form.get("content", "")).strip()
+    if not is_multipart:
+        return title, content_text, str(form.get("image_url", "")).strip(), False
+    
+    image_path = ""
+    image_file = form.get("image_file")
+    if isinstance(image_file, UploadFile) and image_file.filename:
+        file_content = await image_file.read()
+        if file_content:
+            # Générer un nom unique pour éviter les collisions
+            ext = os.path.splitext(image_file.filename)[1] or ".bin"
+            unique_name = f"{uuid.uuid4().hex}{ext}"
+            
+            # Upload vers ImgBB exclusivement
             try:
-                result[field_name] = cleaned.decode(errors="replace")
-            except Exception:
-                result[field_name] = ''
-    return result
+                # Appel HTTP bloquant : exécuté dans un thread pour libérer la boucle d'événements
+                result = await asyncio.to_thread(upload_photo_to_imgbb, file_content, unique_name)
+                if result.get('success'):
+                    # Utiliser l'URL complète ImgBB pour la base de données
+                    image_path = result.get('url')
+                    print(f"✅ Image uploadée vers ImgBB: {image_path}")
+                else:
+                    # En cas d'échec, utiliser l'image par défaut ImgBB
+                    image_path = DEFAULT_ARTICLE_IMAGE_URL
+                    print(f"⚠️ Échec upload ImgBB, utilisation image par défaut: {result.get('error')}")
+            except Exception as e:
+                # En cas d'erreur, utiliser l'image par défaut ImgBB
+                image_path = DEFAULT_ARTICLE_IMAGE_URL
+                print(f"❌ Erreur ImgBB, utilisation image par défaut: {e}")
+    return title, content_text, image_path, True
 
 
 def get_db_connection():
@@ -560,7 +729,6 @@ def get_db_connection():
     Returns:
         Instance de connexion à la base de données.
     """
-    from database import get_db_connection as get_db_conn
     return get_db_conn()
 
 def send_email(to_email: str, subject: str, html_content: str, text_content: str = None) -> bool:
@@ -608,8 +776,32 @@ def send_email(to_email: str, subject: str, html_content: str, text_content: str
         return False
 
 
+# Modèle iCalendar (RFC 5545 : lignes terminées par CRLF), rempli via str.format_map
+ICS_TEMPLATE = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "PRODID:-//CMTCH//Tennis Club//FR\r\n"
+    "CALSCALE:GREGORIAN\r\n"
+    "METHOD:PUBLISH\r\n"
+    "BEGIN:VEVENT\r\n"
+    "UID:{uid}\r\n"
+    "DTSTAMP:{dtstamp}\r\n"
+    "DTSTART:{dtstart}\r\n"
+    "DTEND:{dtend}\r\n"
+    "SUMMARY:{title}\r\n"
+    "DESCRIPTION:{description}\r\n"
+    "LOCATION:{location}\r\n"
+    "STATUS:CONFIRMED\r\n"
+    "SEQUENCE:0\r\n"
+    "END:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+ICS_DATETIME_FORMAT = "%Y%m%dT%H%M%SZ"
+
+
 def generate_ics_content(event_title: str, event_description: str, start_datetime: datetime, 
-                        end_datetime: datetime, location: str = "Club Municipal de Tennis Chihia") -> str:
+                        end_datetime: datetime, location: str = "Club Municipal de Tennis Chihia",
+                        uid: Optional[str] = None) -> str:
     """Génère le contenu d'un fichier ICS (iCalendar).
     
     Args:
@@ -618,36 +810,40 @@ def generate_ics_content(event_title: str, event_description: str, start_datetim
         start_datetime: Date et heure de début
         end_datetime: Date et heure de fin
         location: Lieu de l'événement
+        uid: Identifiant stable de l'événement (aléatoire si absent)
         
     Returns:
         Contenu du fichier ICS
     """
-    # Format des dates pour ICS
-    def format_datetime(dt):
-        return dt.strftime("%Y%m%dT%H%M%SZ")
-    
-    # Préparer la description en échappant les caractères spéciaux
-    description = event_description.replace(chr(10), '\\n').replace(chr(13), '')
-    
-    ics_content = f"""BEGIN:VCALENDAR
-VERSION:2.0
-PRODID:-//CMTCH//Tennis Club//FR
-CALSCALE:GREGORIAN
-METHOD:PUBLISH
-BEGIN:VEVENT
-UID:{uuid.uuid4()}@cmtch.tn
-DTSTAMP:{format_datetime(datetime.utcnow())}
-DTSTART:{format_datetime(start_datetime)}
-DTEND:{format_datetime(end_datetime)}
-SUMMARY:{event_title}
-DESCRIPTION:{description}
-LOCATION:{location}
-STATUS:CONFIRMED
-SEQUENCE:0
-END:VEVENT
-END:VCALENDAR"""
-    
-    return ics_content
+    return ICS_TEMPLATE.format_map({
+        "uid": uid or f"{uuid.uuid4()}@cmtch.tn",
+        "dtstamp": datetime.utcnow().strftime(ICS_DATETIME_FORMAT),
+        "dtstart": start_datetime.strftime(ICS_DATETIME_FORMAT),
+        "dtend": end_datetime.strftime(ICS_DATETIME_FORMAT),
+        "title": event_title,
+        # Échapper les retours à la ligne de la description
+        "description": event_description.replace(chr(10), '\\n').replace(chr(13), ''),
+        "location": location,
+    })
+
+
+@lru_cache(maxsize=512)
+def build_reservation_ics(reservation_id: int, court_number: int, start_datetime: datetime,
+                          end_datetime: datetime, full_name: str) -> bytes:
+    """Retourne le fichier ICS d'une réservation, mémorisé par contenu de réservation.
+
+    L'UID est dérivé de l'identifiant de la réservation : les exports successifs
+    sont identiques et les agendas reconnaissent le même événement.
+    """
+    ics_content = generate_ics_content(
+        f"Tennis - Court {court_number}",
+        f"Réservation de tennis sur le court {court_number} avec {full_name}",
+        start_datetime,
+        end_datetime,
+        "Club Municipal de Tennis Chihia",
+        uid=f"reservation-{reservation_id}@cmtch.tn",
+    )
+    return ics_content.encode("utf-8")
 
 
 def send_reservation_confirmation_email(user_email: str, user_name: str, reservation_data: Dict) -> bool:
@@ -839,7 +1035,6 @@ def hash_password(password: str) -> str:
     Returns:
         Chaîne hexadécimale représentant l'empreinte.
     """
-    from database import hash_password as hash_pwd
     return hash_pwd(password)
 
 
@@ -1266,9 +1461,69 @@ def auto_backup_system():
 # auto_backup_system()
 
 
+# Utilisateurs résolus récemment, par jeton de session : les requêtes
+# rapprochées d'un même membre ne relisent ni la session ni la table users
+_current_user_cache = TTLCache(maxsize=1024, ttl=30)
+
+# Nombre total de membres affiché par la pagination de l'administration
+_members_count_cache = TTLCache(maxsize=1, ttl=60)
+
+
+# Statistiques de réservation par utilisateur (/reservations/stats)
+_user_stats_cache = TTLCache(maxsize=2048, ttl=60)
+
+# Statistiques mensuelles de /espace, par utilisateur
+_dashboard_cache = TTLCache(maxsize=2048, ttl=120)
+
+# Événements du calendrier (/reservations/calendar), par plage (start, end) :
+# le contenu ne dépend pas de l'utilisateur qui consulte
+_calendar_cache = TTLCache(maxsize=256, ttl=900)
+
+
+def invalidate_reservation_caches(user_id: Optional[int] = None,
+                                  dates: Optional[List[str]] = None) -> None:
+    """Vide les caches dérivés de la table reservations après une modification.
+
+    Args:
+        user_id: Utilisateur concerné, ou None si plusieurs utilisateurs peuvent l'être.
+        dates: Dates (YYYY-MM-DD) modifiées, ou None si elles ne sont pas connues.
+    """
+    if user_id is None:
+        _user_stats_cache.clear()
+        _dashboard_cache.clear()
+    else:
+        _user_stats_cache.pop(user_id)
+        _dashboard_cache.pop(user_id)
+
+    if dates is None:
+        _calendar_cache.clear()
+        return
+    for start, end in _calendar_cache.keys():
+        if not start or not end or any(start <= day <= end for day in dates):
+            _calendar_cache.pop((start, end))
+
+
+def invalidate_member_caches() -> None:
+    """Vide les caches dérivés de la table users après une modification.
+
+    Les événements du calendrier portent le nom des membres (et disparaissent
+    avec eux) : ils sont vidés aussi.
+    """
+    _current_user_cache.clear()
+    _members_count_cache.clear()
+    _calendar_cache.clear()
+
+
+# Sentinelle distinguant « pas encore résolu » d'un utilisateur anonyme (None)
+_MISSING = object()
+
+
 def get_current_user(request: Request) -> Optional[sqlite3.Row]:
     """Retourne l'utilisateur actuellement connecté à partir du cookie de session.
 
+    Le résultat est mémorisé sur la requête (``request.state``) et, pendant
+    quelques secondes, dans un cache partagé indexé par jeton de session.
+
     Args:
         request: L'objet Request en cours.
 
@@ -1276,13 +1531,29 @@ def get_current_user(request: Request) -> Optional[sqlite3.Row]:
         Une ligne représentant l'utilisateur, ou None si aucun utilisateur
         n'est authentifié.
     """
+    cached = getattr(request.state, "_cached_user", _MISSING)
+    if cached is not _MISSING:
+        return cached
+    
     token = request.cookies.get("session_token")
     if not token:
+        request.state._cached_user = None
         return None
     
-    # Récupérer l'IP et user agent pour la validation
+    user = _current_user_cache.get(token)
+    if user is None:
+        user = load_user_for_token(request, token)
+        if user is not None:
+            _current_user_cache.set(token, user)
+    
+    request.state._cached_user = user
+    return user
+
+
+def load_user_for_token(request: Request, token: str) -> Optional[sqlite3.Row]:
+    """Valide le jeton de session et charge l'utilisateur correspondant depuis la base."""
+    # Récupérer l'IP pour la validation
     ip_address = request.client.host if request.client else None
-    user_agent = request.headers.get("user-agent")
     
     # Valider le token avec le nouveau système sécurisé
     user_id = validate_session_token(token, ip_address)
@@ -1292,21 +1563,8 @@ def get_current_user(request: Request) -> Optional[sqlite3.Row]:
     # Récupérer les informations de l'utilisateur
     conn = get_db_connection()
     try:
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            # Utiliser le curseur MySQL avec noms de colonnes
-            from database import get_mysql_cursor_with_names, convert_mysql_result
-            execute_with_names = get_mysql_cursor_with_names(conn)
-            cur, column_names = execute_with_names("SELECT * FROM users WHERE id = %s", (user_id,))
-            user = cur.fetchone()
-            user = convert_mysql_result(user, column_names)
-        else:
-            # Connexion SQLite/PostgreSQL normale
-            cur = conn.cursor()
-            cur.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-            user = cur.fetchone()
-        
-        return user
+        rows, _ = db_execute(conn, "SELECT * FROM users WHERE id = ?", (user_id,))
+        return rows[0] if rows else None
     finally:
         conn.close()
 
@@ -1363,6 +1621,13 @@ async def startup() -> None:
     except Exception as e:
         print(f"⚠️ Impossible de vérifier l'état de la base : {e}")
     
+    # Créer les index de performance manquants (sans modifier les données)
+    try:
+        ensure_indexes()
+        print("✅ Index de performance vérifiés")
+    except Exception as e:
+        print(f"⚠️ Erreur lors de la création des index : {e}")
+    
     # Nettoyer les sessions expirées au démarrage
     try:
         cleanup_expired_sessions()
@@ -1370,9 +1635,24 @@ async def startup() -> None:
     except Exception as e:
         print(f"⚠️ Erreur lors du nettoyage des sessions : {e}")
     
+    # Compiler les templates dès le démarrage plutôt qu'à la première requête
+    try:
+        for template_name in templates.env.list_templates(extensions=["html"]):
+            templates.env.get_template(template_name)
+        print("✅ Templates compilés")
+    except Exception as e:
+        print(f"⚠️ Erreur lors de la compilation des templates : {e}")
+    
     print("🎉 Application prête !")
 
 
+# Les trois derniers articles mis en avant sur l'accueil
+SQL_LATEST_ARTICLES = (
+    "SELECT id, title, content, image_path, created_at FROM articles "
+    "ORDER BY created_at DESC, id DESC LIMIT 3"
+)
+
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request) -> HTMLResponse:
     """Page d'accueil du site.
@@ -1391,23 +1671,7 @@ async def home(request: Request) -> HTMLResponse:
     )
     # Récupérer les trois derniers articles pour les mettre en avant sur l'accueil
     conn = get_db_connection()
-    
-    # Vérifier si c'est une connexion MySQL
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        from database import get_mysql_cursor_with_names, convert_mysql_result
-        execute_with_names = get_mysql_cursor_with_names(conn)
-        cur, column_names = execute_with_names(
-            "SELECT id, title, content, image_path, created_at FROM articles ORDER BY created_at DESC LIMIT 3"
-        )
-        latest_articles = cur.fetchall()
-        # Convertir les tuples MySQL en objets avec attributs nommés
-        latest_articles = [convert_mysql_result(article, column_names) for article in latest_articles]
-    else:
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT id, title, content, image_path, created_at FROM articles ORDER BY created_at DESC LIMIT 3"
-        )
-        latest_articles = cur.fetchall()
+    latest_articles, _ = db_execute(conn, SQL_LATEST_ARTICLES)
     conn.close()
     return templates.TemplateResponse(
         "index.html",
@@ -1438,6 +1702,34 @@ async def registration_form(request: Request) -> HTMLResponse:
     )
 
 
+def find_member_conflicts(conn, username: str, email: str, phone: str) -> List[str]:
+    """Vérifie en une seule requête que le nom d'utilisateur, l'email et le téléphone sont libres.
+
+    Returns:
+        La liste des messages d'erreur, vide si aucun des trois n'est déjà utilisé.
+    """
+    rows, _ = db_execute(
+        conn,
+        "SELECT username, email, phone FROM users WHERE username = ? OR email = ? OR phone = ?",
+        (username, email, phone),
+    )
+    
+    # La comparaison ignore la casse, comme les collations MySQL par défaut
+    def same(value: Any, expected: str) -> bool:
+        return value is not None and str(value).casefold() == expected.casefold()
+    
+    errors: List[str] = []
+    if any(same(row.username, username) for row in rows):
+        errors.append("Ce nom d'utilisateur est déjà utilisé.")
+    email_owner = next((row.username for row in rows if same(row.email, email)), None)
+    if email_owner is not None:
+        errors.append(f"Cette adresse email ({email}) est déjà utilisée par l'utilisateur '{email_owner}'. Si c'est votre compte, vous pouvez récupérer votre mot de passe.")
+    phone_owner = next((row.username for row in rows if same(row.phone, phone)), None)
+    if phone_owner is not None:
+        errors.append(f"Ce numéro de téléphone ({phone}) est déjà utilisé par l'utilisateur '{phone_owner}'. Si c'est votre compte, vous pouvez récupérer votre mot de passe.")
+    return errors
+
+
 @app.post("/inscription", response_class=HTMLResponse)
 async def register(request: Request) -> HTMLResponse:
     """Traite la soumission du formulaire d'inscription.
@@ -1488,45 +1780,7 @@ async def register(request: Request) -> HTMLResponse:
         # Vérifier que le nom d'utilisateur, l'email et le téléphone n'existent pas déjà
         conn = get_db_connection()
         
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur = conn.cursor()
-            # Vérifier le nom d'utilisateur
-            cur.execute("SELECT id, username FROM users WHERE username = %s", (username,))
-            existing_user = cur.fetchone()
-            if existing_user:
-                errors.append("Ce nom d'utilisateur est déjà utilisé.")
-            
-            # Vérifier l'email
-            cur.execute("SELECT id, username, email FROM users WHERE email = %s", (email,))
-            existing_email = cur.fetchone()
-            if existing_email:
-                errors.append(f"Cette adresse email ({email}) est déjà utilisée par l'utilisateur '{existing_email[1]}'. Si c'est votre compte, vous pouvez récupérer votre mot de passe.")
-            
-            # Vérifier le téléphone
-            cur.execute("SELECT id, username, phone FROM users WHERE phone = %s", (phone,))
-            existing_phone = cur.fetchone()
-            if existing_phone:
-                errors.append(f"Ce numéro de téléphone ({phone}) est déjà utilisé par l'utilisateur '{existing_phone[1]}'. Si c'est votre compte, vous pouvez récupérer votre mot de passe.")
-        else:
-            cur = conn.cursor()
-            # Vérifier le nom d'utilisateur
-            cur.execute("SELECT id, username FROM users WHERE username = ?", (username,))
-            existing_user = cur.fetchone()
-            if existing_user:
-                errors.append("Ce nom d'utilisateur est déjà utilisé.")
-            
-            # Vérifier l'email
-            cur.execute("SELECT id, username, email FROM users WHERE email = ?", (email,))
-            existing_email = cur.fetchone()
-            if existing_email:
-                errors.append(f"Cette adresse email ({email}) est déjà utilisée par l'utilisateur '{existing_email[1]}'. Si c'est votre compte, vous pouvez récupérer votre mot de passe.")
-            
-            # Vérifier le téléphone
-            cur.execute("SELECT id, username, phone FROM users WHERE phone = ?", (phone,))
-            existing_phone = cur.fetchone()
-            if existing_phone:
-                errors.append(f"Ce numéro de téléphone ({phone}) est déjà utilisé par l'utilisateur '{existing_phone[1]}'. Si c'est votre compte, vous pouvez récupérer votre mot de passe.")
+        errors.extend(find_member_conflicts(conn, username, email, phone))
             
         if errors:
             conn.close()
@@ -1545,31 +1799,25 @@ async def register(request: Request) -> HTMLResponse:
                 },
             )
             
-        # Création de l'utilisateur
-        pwd_hash = hash_password(password)
+        # Création de l'utilisateur (hachage hors de la boucle d'événements)
+        pwd_hash = await asyncio.to_thread(hash_password, password)
         is_trainer = 1 if role == "trainer" else 0
         
         # Vérification email désactivée - marquer directement comme vérifié
         email_verification_token = None
         email_verified = 1
         
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur.execute(
-                "INSERT INTO users (username, password_hash, full_name, email, phone, ijin_number, birth_date, photo_path, is_admin, validated, is_trainer, email_verification_token, email_verified) "
-                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 0, 0, %s, %s, %s)",
-                (username, pwd_hash, full_name, email, phone, ijin_number, birth_date, "", is_trainer, email_verification_token, email_verified),
-            )
-        else:
-            cur.execute(
-                "INSERT INTO users (username, password_hash, full_name, email, phone, ijin_number, birth_date, photo_path, is_admin, validated, is_trainer, email_verification_token, email_verified) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, 0, ?, ?, ?)",
-                (username, pwd_hash, full_name, email, phone, ijin_number, birth_date, "", is_trainer, email_verification_token, email_verified),
-            )
+        db_execute_write(
+            conn,
+            "INSERT INTO users (username, password_hash, full_name, email, phone, ijin_number, birth_date, photo_path, is_admin, validated, is_trainer, email_verification_token, email_verified) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, 0, ?, ?, ?)",
+            (username, pwd_hash, full_name, email, phone, ijin_number, birth_date, "", is_trainer, email_verification_token, email_verified),
+        )
         conn.commit()
+        invalidate_member_caches()
         conn.close()
         
-        print(f"✅ Utilisateur créé avec succès: {username}")
+        log.info("✅ Utilisateur créé avec succès: %s", username)
         
         # Vérification email désactivée - redirection simple
         return templates.TemplateResponse(
@@ -1583,7 +1831,7 @@ async def register(request: Request) -> HTMLResponse:
         )
         
     except Exception as e:
-        print(f"❌ Erreur lors de l'inscription: {e}")
+        log.error("❌ Erreur lors de l'inscription: %s", e)
         return templates.TemplateResponse(
             "register.html",
             {
@@ -1600,30 +1848,47 @@ async def register(request: Request) -> HTMLResponse:
         )
 
 
+# Cache LRU des tokens de validation déjà traités (invalides ou déjà utilisés)
+# pour répondre aux clics répétés et aux robots sans interroger la base
+EMAIL_TOKEN_CACHE_SIZE = 4096
+_email_token_errors: "OrderedDict[str, str]" = OrderedDict()
+
+
+def remember_email_token_error(token: str, error: str) -> None:
+    """Mémorise le message d'erreur associé à un token de validation."""
+    _email_token_errors[token] = error
+    _email_token_errors.move_to_end(token)
+    if len(_email_token_errors) > EMAIL_TOKEN_CACHE_SIZE:
+        _email_token_errors.popitem(last=False)
+
+
 @app.get("/verifier-email/{token}", response_class=HTMLResponse)
 async def verify_email(request: Request, token: str) -> HTMLResponse:
     """Valide l'adresse email d'un utilisateur via un token."""
+    cached_error = _email_token_errors.get(token)
+    if cached_error is not None:
+        _email_token_errors.move_to_end(token)
+        return templates.TemplateResponse(
+            "email_verification_error.html",
+            {
+                "request": request,
+                "error": cached_error
+            }
+        )
+    
     try:
         conn = get_db_connection()
         
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT id, username, email, email_verified FROM users WHERE email_verification_token = %s",
-                (token,)
-            )
-        else:
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT id, username, email, email_verified FROM users WHERE email_verification_token = ?",
-                (token,)
-            )
-        
-        user = cur.fetchone()
+        rows, _ = db_execute(
+            conn,
+            "SELECT id, username, email, email_verified FROM users WHERE email_verification_token = ?",
+            (token,)
+        )
+        user = rows[0] if rows else None
         
         if not user:
             conn.close()
+            remember_email_token_error(token, "Token de validation invalide ou expiré.")
             return templates.TemplateResponse(
                 "email_verification_error.html",
                 {
@@ -1632,10 +1897,11 @@ async def verify_email(request: Request, token: str) -> HTMLResponse:
                 }
             )
         
-        user_id, username, email, email_verified = user
+        user_id, username, email, email_verified = user.id, user.username, user.email, user.email_verified
         
         if email_verified:
             conn.close()
+            remember_email_token_error(token, "Cette adresse email a déjà été validée.")
             return templates.TemplateResponse(
                 "email_verification_error.html",
                 {
@@ -1645,20 +1911,18 @@ async def verify_email(request: Request, token: str) -> HTMLResponse:
             )
         
         # Marquer l'email comme vérifié
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur.execute(
-                "UPDATE users SET email_verified = 1, email_verification_token = NULL WHERE id = %s",
-                (user_id,)
-            )
-        else:
-            cur.execute(
-                "UPDATE users SET email_verified = 1, email_verification_token = NULL WHERE id = ?",
-                (user_id,)
-            )
+        db_execute_write(
+            conn,
+            "UPDATE users SET email_verified = 1, email_verification_token = NULL WHERE id = ?",
+            (user_id,)
+        )
         
         conn.commit()
         conn.close()
         
+        # Les clics suivants sur le même lien sont servis sans accès à la base
+        remember_email_token_error(token, "Cette adresse email a déjà été validée.")
+        
         return templates.TemplateResponse(
             "email_verification_success.html",
             {
@@ -1669,7 +1933,7 @@ async def verify_email(request: Request, token: str) -> HTMLResponse:
         )
         
     except Exception as e:
-        print(f"❌ Erreur lors de la validation email: {e}")
+        log.error("❌ Erreur lors de la validation email: %s", e)
         return templates.TemplateResponse(
             "email_verification_error.html",
             {
@@ -1707,19 +1971,8 @@ async def login(request: Request) -> HTMLResponse:
         # Connexion à la base de données
         conn = get_db_connection()
         
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            # Utiliser le curseur MySQL avec noms de colonnes
-            from database import get_mysql_cursor_with_names, convert_mysql_result
-            execute_with_names = get_mysql_cursor_with_names(conn)
-            cur, column_names = execute_with_names("SELECT * FROM users WHERE username = %s", (username,))
-            user = cur.fetchone()
-            user = convert_mysql_result(user, column_names)
-        else:
-            # Connexion SQLite/PostgreSQL normale
-            cur = conn.cursor()
-            cur.execute("SELECT * FROM users WHERE username = ?", (username,))
-            user = cur.fetchone()
+        rows, _ = db_execute(conn, "SELECT * FROM users WHERE username = ?", (username,))
+        user = rows[0] if rows else None
         
         conn.close()
         
@@ -1728,7 +1981,7 @@ async def login(request: Request) -> HTMLResponse:
         # Vérification de l'utilisateur
         if user is None:
             errors.append("Nom d'utilisateur ou mot de passe incorrect.")
-        elif not verify_password(password, user.password_hash):
+        elif not await asyncio.to_thread(verify_password, password, user.password_hash):
             errors.append("Nom d'utilisateur ou mot de passe incorrect.")
         elif not user.validated:
             errors.append("Votre inscription n'a pas encore été validée par un administrateur.")
@@ -1761,7 +2014,7 @@ async def login(request: Request) -> HTMLResponse:
         
     except Exception as e:
         # Gestion des erreurs
-        print(f"Erreur lors de la connexion: {e}")
+        log.error("❌ Erreur lors de la connexion: %s", e)
         return templates.TemplateResponse(
             "login.html",
             {"request": request, "errors": ["Une erreur s'est produite. Veuillez réessayer."], "username": username if 'username' in locals() else ""},
@@ -1987,317 +2240,135 @@ async def reservations_page(request: Request) -> HTMLResponse:
     selected_date = request.query_params.get("date", today_str)
     view_type = request.query_params.get("view", "day")  # day, week, month
     
-    # Calculer les dates de la semaine si vue semaine
+    # Grilles de dates (mémorisées par semaine / par mois) et créneaux horaires
     week_start = None
     week_end = None
-    week_dates = []
+    week_dates: Tuple[dict, ...] = ()
+    month_dates: Tuple[dict, ...] = ()
+    month_title = None
     
     if view_type == "week":
         selected_date_obj = datetime.strptime(selected_date, "%Y-%m-%d").date()
         # Trouver le lundi de la semaine
-        days_since_monday = selected_date_obj.weekday()
-        week_start = selected_date_obj - timedelta(days=days_since_monday)
+        week_start = selected_date_obj - timedelta(days=selected_date_obj.weekday())
         week_end = week_start + timedelta(days=6)
-        
-        # Générer toutes les dates de la semaine avec informations formatées
-        current_date = week_start
-        while current_date <= week_end:
-            day_names = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
-            day_index = current_date.weekday()
-            week_dates.append({
-                "date": current_date.isoformat(),
-                "day_name": day_names[day_index],
-                "day_number": current_date.day
-            })
-            current_date += timedelta(days=1)
+        week_dates = build_week_dates(week_start)
+    elif view_type == "month":
+        selected_date_obj = datetime.strptime(selected_date, "%Y-%m-%d").date()
+        month_dates, month_title = build_month_skeleton(selected_date_obj.year, selected_date_obj.month)
+    
+    time_slots = build_time_slots()
     
     # Récupérer les réservations
     conn = get_db_connection()
     
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        from database import get_mysql_cursor_with_names, convert_mysql_result
-        execute_with_names = get_mysql_cursor_with_names(conn)
-        
-        # Réservations pour la date sélectionnée ou la semaine
-        if view_type == "week" and week_dates:
-            # Extraire les dates des objets week_dates
-            dates_list = [week_date["date"] for week_date in week_dates]
-            placeholders = ','.join(['%s'] * len(dates_list))
-            cur, column_names = execute_with_names(
-                "SELECT r.*, u.full_name AS user_full_name, u.username FROM reservations r JOIN users u ON r.user_id = u.id "
-                "WHERE date IN (" + placeholders + ") ORDER BY date, start_time",
-                dates_list,
-            )
-        else:
-            cur, column_names = execute_with_names(
-                "SELECT r.*, u.full_name AS user_full_name, u.username FROM reservations r JOIN users u ON r.user_id = u.id "
-                "WHERE date = %s ORDER BY start_time",
-                (selected_date,),
-            )
-        reservations = cur.fetchall()
-        reservations = [convert_mysql_result(res, column_names) for res in reservations]
-        
-        # Réservations de l'utilisateur (toutes)
-        cur, column_names = execute_with_names(
-            "SELECT * FROM reservations WHERE user_id = %s ORDER BY date DESC, start_time",
-            (user.id,),
-        )
-        user_reservations = cur.fetchall()
-        user_reservations = [convert_mysql_result(res, column_names) for res in user_reservations]
-        
-        # Statistiques utilisateur
-        cur, column_names = execute_with_names(
-            "SELECT COUNT(*) as total_reservations, COUNT(DISTINCT date) as days_played FROM reservations WHERE user_id = %s",
-            (user.id,),
-        )
-        stats = cur.fetchone()
-        user_stats = convert_mysql_result(stats, column_names) if stats else {"total_reservations": 0, "days_played": 0}
-        
-    else:
-        cur = conn.cursor()
-        if view_type == "week" and week_dates:
-            # Extraire les dates des objets week_dates
-            dates_list = [week_date["date"] for week_date in week_dates]
-            placeholders = ','.join(['?'] * len(dates_list))
-            cur.execute(
-                "SELECT r.*, u.full_name AS user_full_name, u.username FROM reservations r JOIN users u ON r.user_id = u.id "
-                "WHERE date IN (" + placeholders + ") ORDER BY date, start_time",
-                dates_list,
-            )
-        else:
-            cur.execute(
-                "SELECT r.*, u.full_name AS user_full_name, u.username FROM reservations r JOIN users u ON r.user_id = u.id "
-                "WHERE date = ? ORDER BY start_time",
-                (selected_date,),
-            )
-        reservations = cur.fetchall()
-        
-        cur.execute(
-            "SELECT * FROM reservations WHERE user_id = ? ORDER BY date DESC, start_time",
-            (user.id,),
-        )
-        user_reservations = cur.fetchall()
-        
-        # Statistiques utilisateur
-        cur.execute(
-            "SELECT COUNT(*) as total_reservations, COUNT(DISTINCT date) as days_played FROM reservations WHERE user_id = ?",
-            (user.id,),
+    # Réservations de toute la période affichée (vues semaine et mois), en une requête
+    reservations = []
+    period = None
+    if view_type == "week" and week_dates:
+        period = (week_dates[0]["date"], week_dates[-1]["date"])
+    elif view_type == "month" and month_dates:
+        period = (month_dates[0]["date"], month_dates[-1]["date"])
+    if period:
+        reservations, _ = db_execute(
+            conn,
+            "SELECT r.user_id, r.date, r.court_number, r.start_time, r.end_time, u.full_name AS user_full_name, u.username "
+            "FROM reservations r JOIN users u ON r.user_id = u.id "
+            "WHERE r.date BETWEEN ? AND ? ORDER BY r.date, r.start_time",
+            period,
         )
-        stats = cur.fetchone()
-        user_stats = {"total_reservations": stats[0], "days_played": stats[1]} if stats else {"total_reservations": 0, "days_played": 0}
     
-    conn.close()
+    # Disponibilité du jour sélectionné calculée par la base : chaque couple
+    # (court, créneau) est joint aux réservations qui le chevauchent
+    slots_sql = " UNION ALL ".join(
+        f"SELECT '{start_str}' AS slot_start, '{end_str}' AS slot_end" for start_str, end_str in time_slots
+    )
+    availability_rows, _ = db_execute(
+        conn,
+        "SELECT c.court, s.slot_start, s.slot_end, r.user_id, u.full_name AS user_full_name, u.username "
+        "FROM (SELECT 1 AS court UNION ALL SELECT 2 UNION ALL SELECT 3) c "
+        "CROSS JOIN (" + slots_sql + ") s "
+        "LEFT JOIN reservations r ON r.court_number = c.court AND r.date = ? "
+        "AND SUBSTR(r.start_time, 1, 5) < s.slot_end AND SUBSTR(r.end_time, 1, 5) > s.slot_start "
+        "LEFT JOIN users u ON u.id = r.user_id",
+        (selected_date,),
+    )
     
-    # Générer des créneaux horaires améliorés (6h-23h)
-    time_slots: List[Tuple[str, str]] = []
-    for hour in range(6, 23):
-        start_slot = time(hour, 0)
-        end_slot = time(hour + 1, 0) if hour < 22 else time(23, 0)
-        time_slots.append((start_slot.strftime("%H:%M"), end_slot.strftime("%H:%M")))
+    # Réservations de l'utilisateur (toutes)
+    user_reservations, _ = db_execute(
+        conn,
+        "SELECT * FROM reservations WHERE user_id = ? ORDER BY date DESC, start_time",
+        (user.id,),
+    )
+    
+    # Statistiques utilisateur
+    stats, _ = db_execute(
+        conn,
+        "SELECT COUNT(*) as total_reservations, COUNT(DISTINCT date) as days_played FROM reservations WHERE user_id = ?",
+        (user.id,),
+    )
+    user_stats = stats[0] if stats else {"total_reservations": 0, "days_played": 0}
+    
+    conn.close()
     
     # Préparer la disponibilité avec informations enrichies
     availability: Dict[int, Dict[Tuple[str, str], dict]] = {1: {}, 2: {}, 3: {}}
-    reservations_by_court = {1: [], 2: [], 3: []}
+    for row in availability_rows:
+        slot = (row.slot_start, row.slot_end)
+        if slot in availability[row.court] and availability[row.court][slot]["reserved"]:
+            continue
+        reserved = row.user_id is not None
+        availability[row.court][slot] = {
+            "reserved": reserved,
+            "reservation_info": {
+                "user_full_name": row.user_full_name,
+                "username": row.username or "Utilisateur",
+                "is_current_user": row.user_id == user.id
+            } if reserved else None
+        }
     
+    # Regrouper les réservations par (date, court), heures converties une seule fois en minutes
+    reservations_by_day: Dict[Tuple[str, int], List[Tuple[int, int, dict]]] = defaultdict(list)
     for res in reservations:
-        reservations_by_court[res.court_number].append(res)
-    
-    # Pour chaque court et chaque créneau, déterminer la disponibilité
-    for court in (1, 2, 3):
-        court_reservations = reservations_by_court.get(court, [])
-        for start_str, end_str in time_slots:
-            reserved = False
-            reservation_info = None
-            
-            for res in court_reservations:
-                # Gestion des timedelta MySQL
-                start_time_str = str(res.start_time) if hasattr(res.start_time, 'total_seconds') else res.start_time
-                end_time_str = str(res.end_time) if hasattr(res.end_time, 'total_seconds') else res.end_time
-                
-                if hasattr(res.start_time, 'total_seconds'):
-                    total_seconds = int(res.start_time.total_seconds())
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    start_time_str = f"{hours:02d}:{minutes:02d}"
-                
-                if hasattr(res.end_time, 'total_seconds'):
-                    total_seconds = int(res.end_time.total_seconds())
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    end_time_str = f"{hours:02d}:{minutes:02d}"
-                
-                res_start = datetime.strptime(start_time_str, "%H:%M").time()
-                res_end = datetime.strptime(end_time_str, "%H:%M").time()
-                slot_start = datetime.strptime(start_str, "%H:%M").time()
-                slot_end = datetime.strptime(end_str, "%H:%M").time()
-                
-                if (res_start < slot_end and res_end > slot_start):
-                    reserved = True
-                    reservation_info = {
-                        "user_full_name": res.user_full_name,
-                        "username": getattr(res, 'username', "Utilisateur"),
-                        "is_current_user": res.user_id == user.id
+        reservations_by_day[(str(res.date), res.court_number)].append((
+            time_to_minutes(res.start_time),
+            time_to_minutes(res.end_time),
+            {
+                "user_full_name": res.user_full_name,
+                "username": res.username or "Utilisateur",
+                "is_current_user": res.user_id == user.id
+            },
+        ))
+    slot_minutes = build_slot_minutes()
+    
+    def build_availability_grid(dates: List[str]) -> Dict[str, Dict[int, Dict[Tuple[str, str], dict]]]:
+        """Construit la disponibilité de chaque court et créneau pour les dates données."""
+        grid = {}
+        for date_str in dates:
+            grid[date_str] = {}
+            for court in (1, 2, 3):
+                court_reservations = reservations_by_day.get((date_str, court), ())
+                court_slots = {}
+                for slot, (slot_start, slot_end) in zip(time_slots, slot_minutes):
+                    reservation_info = next(
+                        (info for res_start, res_end, info in court_reservations
+                         if res_start < slot_end and res_end > slot_start),
+                        None,
+                    )
+                    court_slots[slot] = {
+                        "reserved": reservation_info is not None,
+                        "reservation_info": reservation_info
                     }
-                    break
-            availability[court][(start_str, end_str)] = {
-                "reserved": reserved,
-                "reservation_info": reservation_info
-            }
+                grid[date_str][court] = court_slots
+        return grid
     
-    # Préparer les données pour la vue semaine (disponibilité par court et par jour)
+    # Disponibilité par court et par créneau pour les vues semaine et mois
     week_availability = {}
     month_availability = {}
-    
     if view_type == "week" and week_dates:
-        for week_date in week_dates:
-            date_str = week_date["date"]
-            week_availability[date_str] = {}
-            
-            for court in (1, 2, 3):
-                week_availability[date_str][court] = {}
-                for start_str, end_str in time_slots:
-                    # Chercher les réservations pour ce court, cette date et ce créneau
-                    reserved = False
-                    reservation_info = None
-                    
-                    for res in reservations:
-                        if (res.court_number == court and 
-                            res.date == date_str):
-                            
-                            # Gestion des timedelta MySQL
-                            start_time_str = str(res.start_time) if hasattr(res.start_time, 'total_seconds') else res.start_time
-                            end_time_str = str(res.end_time) if hasattr(res.end_time, 'total_seconds') else res.end_time
-                            
-                            if hasattr(res.start_time, 'total_seconds'):
-                                total_seconds = int(res.start_time.total_seconds())
-                                hours = total_seconds // 3600
-                                minutes = (total_seconds % 3600) // 60
-                                start_time_str = f"{hours:02d}:{minutes:02d}"
-                            
-                            if hasattr(res.end_time, 'total_seconds'):
-                                total_seconds = int(res.end_time.total_seconds())
-                                hours = total_seconds // 3600
-                                minutes = (total_seconds % 3600) // 60
-                                end_time_str = f"{hours:02d}:{minutes:02d}"
-                            
-                            res_start = datetime.strptime(start_time_str, "%H:%M").time()
-                            res_end = datetime.strptime(end_time_str, "%H:%M").time()
-                            slot_start = datetime.strptime(start_str, "%H:%M").time()
-                            slot_end = datetime.strptime(end_str, "%H:%M").time()
-                            
-                            if (res_start < slot_end and res_end > slot_start):
-                                reserved = True
-                                reservation_info = {
-                                    "user_full_name": res.user_full_name,
-                                    "username": getattr(res, 'username', "Utilisateur"),
-                                    "is_current_user": res.user_id == user.id
-                                }
-                                break
-                    
-                    week_availability[date_str][court][(start_str, end_str)] = {
-                        "reserved": reserved,
-                        "reservation_info": reservation_info
-                    }
-    
-    # Préparer les données pour la vue mois
-    if view_type == "month":
-        # Calculer le début et la fin du mois
-        selected_date_obj = datetime.strptime(selected_date, "%Y-%m-%d").date()
-        month_start = selected_date_obj.replace(day=1)
-        
-        # Formater le titre du mois
-        month_names = [
-            "Janvier", "Février", "Mars", "Avril", "Mai", "Juin",
-            "Juillet", "Août", "Septembre", "Octobre", "Novembre", "Décembre"
-        ]
-        month_title = f"{month_names[selected_date_obj.month - 1]} {selected_date_obj.year}"
-        
-        # Trouver le dernier jour du mois
-        if month_start.month == 12:
-            month_end = month_start.replace(year=month_start.year + 1, month=1, day=1) - timedelta(days=1)
-        else:
-            month_end = month_start.replace(month=month_start.month + 1, day=1) - timedelta(days=1)
-        
-        # Générer toutes les dates du mois
-        month_dates = []
-        current_date = month_start
-        while current_date <= month_end:
-            month_dates.append({
-                "date": current_date.isoformat(),
-                "day_number": current_date.day,
-                "is_current_month": True
-            })
-            current_date += timedelta(days=1)
-        
-        # Ajouter les jours de la semaine précédente pour compléter la première semaine
-        days_before = month_start.weekday()
-        for i in range(days_before - 1, -1, -1):
-            prev_date = month_start - timedelta(days=i + 1)
-            month_dates.insert(0, {
-                "date": prev_date.isoformat(),
-                "day_number": prev_date.day,
-                "is_current_month": False
-            })
-        
-        # Ajouter les jours de la semaine suivante pour compléter la dernière semaine
-        days_after = 6 - month_end.weekday()
-        for i in range(1, days_after + 1):
-            next_date = month_end + timedelta(days=i)
-            month_dates.append({
-                "date": next_date.isoformat(),
-                "day_number": next_date.day,
-                "is_current_month": False
-            })
-        
-        # Calculer la disponibilité pour chaque jour du mois
-        for date_info in month_dates:
-            date_str = date_info["date"]
-            month_availability[date_str] = {}
-            
-            for court in (1, 2, 3):
-                month_availability[date_str][court] = {}
-                for start_str, end_str in time_slots:
-                    reserved = False
-                    reservation_info = None
-                    
-                    for res in reservations:
-                        if (res.court_number == court and 
-                            res.date == date_str):
-                            
-                            # Gestion des timedelta MySQL
-                            start_time_str = str(res.start_time) if hasattr(res.start_time, 'total_seconds') else res.start_time
-                            end_time_str = str(res.end_time) if hasattr(res.end_time, 'total_seconds') else res.end_time
-                            
-                            if hasattr(res.start_time, 'total_seconds'):
-                                total_seconds = int(res.start_time.total_seconds())
-                                hours = total_seconds // 3600
-                                minutes = (total_seconds % 3600) // 60
-                                start_time_str = f"{hours:02d}:{minutes:02d}"
-                            
-                            if hasattr(res.end_time, 'total_seconds'):
-                                total_seconds = int(res.end_time.total_seconds())
-                                hours = total_seconds // 3600
-                                minutes = (total_seconds % 3600) // 60
-                                end_time_str = f"{hours:02d}:{minutes:02d}"
-                            
-                            res_start = datetime.strptime(start_time_str, "%H:%M").time()
-                            res_end = datetime.strptime(end_time_str, "%H:%M").time()
-                            slot_start = datetime.strptime(start_str, "%H:%M").time()
-                            slot_end = datetime.strptime(end_str, "%H:%M").time()
-                            
-                            if (res_start < slot_end and res_end > slot_start):
-                                reserved = True
-                                reservation_info = {
-                                    "user_full_name": res.user_full_name,
-                                    "username": getattr(res, 'username', "Utilisateur"),
-                                    "is_current_user": res.user_id == user.id
-                                }
-                                break
-                    
-                    month_availability[date_str][court][(start_str, end_str)] = {
-                        "reserved": reserved,
-                        "reservation_info": reservation_info
-                    }
+        week_availability = build_availability_grid([week_date["date"] for week_date in week_dates])
+    elif view_type == "month":
+        month_availability = build_availability_grid([date_info["date"] for date_info in month_dates])
     
     # Préparer les données pour le template
     template_data = {
@@ -2317,7 +2388,7 @@ async def reservations_page(request: Request) -> HTMLResponse:
         "week_end": week_end.isoformat() if week_end else None,
         "week_dates": week_dates,
         "month_dates": month_dates if view_type == "month" else None,
-        "month_title": month_title if view_type == "month" else None,
+        "month_title": month_title,
         "today_date": today_str,
     }
     
@@ -2325,11 +2396,12 @@ async def reservations_page(request: Request) -> HTMLResponse:
 
 
 @app.post("/reservations", response_class=HTMLResponse)
-async def create_reservation(request: Request) -> HTMLResponse:
+async def create_reservation(request: Request, background_tasks: BackgroundTasks) -> HTMLResponse:
     """Crée une réservation si l'horaire est disponible.
 
-    Vérifie les conflits avec les réservations existantes sur le même court
-    avant d'insérer une nouvelle ligne.
+    Le contrôle des conflits et l'insertion se font en une seule requête :
+    la ligne n'est insérée que si aucune réservation ne chevauche le créneau
+    sur le même court.
     """
     user = get_current_user(request)
     if not user:
@@ -2339,28 +2411,12 @@ async def create_reservation(request: Request) -> HTMLResponse:
             "not_validated.html",
             {"request": request, "message": "Votre inscription doit être validée pour accéder aux réservations."},
         )
-    raw_body = await request.body()
-    form = urllib.parse.parse_qs(raw_body.decode(), keep_blank_values=True)
-    date_field = form.get("date", [""])[0]
-    court_number_raw = form.get("court_number", [""])[0]
-    start_time = form.get("start_time", [""])[0]
-    end_time = form.get("end_time", [""])[0]
-    # Conversion de court_number
-    try:
-        court_number = int(court_number_raw)
-    except (ValueError, TypeError):
-        court_number = None
-    errors: List[str] = []
-    try:
-        _date = datetime.strptime(date_field, "%Y-%m-%d").date()
-        _start = datetime.strptime(start_time, "%H:%M").time()
-        _end = datetime.strptime(end_time, "%H:%M").time()
-        if _start >= _end:
-            errors.append("L'heure de fin doit être postérieure à l'heure de début.")
-    except ValueError:
-        errors.append("Format de date ou d'heure invalide.")
-    if court_number not in (1, 2, 3):
-        errors.append("Numéro de court invalide.")
+    form = await request.form()
+    date_field = str(form.get("date", ""))
+    court_number_raw = str(form.get("court_number", ""))
+    start_time = str(form.get("start_time", ""))
+    end_time = str(form.get("end_time", ""))
+    court_number, parsed_dates, errors = validate_reservation_slot(court_number_raw, start_time, end_time, date_field)
     if errors:
         return templates.TemplateResponse(
             "reservation_error.html",
@@ -2371,45 +2427,21 @@ async def create_reservation(request: Request) -> HTMLResponse:
                 "selected_date": date_field,
             },
         )
-    # Vérifier les conflits
+    _date = parsed_dates[0]
+    # Insertion conditionnelle : deux créneaux se chevauchent si chacun commence
+    # avant la fin de l'autre ; le prédicat exploite l'index (date, court_number, start_time)
     conn = get_db_connection()
-    
-    # Vérifier si c'est une connexion MySQL
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT * FROM reservations WHERE court_number = %s AND date = %s AND "
-            "((start_time < %s AND end_time > %s) OR (start_time < %s AND end_time > %s) OR (start_time >= %s AND end_time <= %s))",
-            (
-                court_number,
-                _date.isoformat(),
-                end_time,
-                end_time,
-                start_time,
-                start_time,
-                start_time,
-                end_time,
-            ),
-        )
-        conflict = cur.fetchone()
-    else:
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT * FROM reservations WHERE court_number = ? AND date = ? AND "
-            "((start_time < ? AND end_time > ?) OR (start_time < ? AND end_time > ?) OR (start_time >= ? AND end_time <= ?))",
-            (
-                court_number,
-                _date.isoformat(),
-                end_time,
-                end_time,
-                start_time,
-                start_time,
-                start_time,
-                end_time,
-            ),
-        )
-        conflict = cur.fetchone()
-    if conflict:
+    cur = db_execute_write(
+        conn,
+        "INSERT INTO reservations (user_id, court_number, date, start_time, end_time) "
+        "SELECT ?, ?, ?, ?, ? FROM (SELECT 1 AS one) AS candidate "
+        "WHERE NOT EXISTS (SELECT 1 FROM reservations WHERE court_number = ? AND date = ? AND start_time < ? AND end_time > ?)",
+        (
+            user.id, court_number, _date.isoformat(), start_time, end_time,
+            court_number, _date.isoformat(), end_time, start_time,
+        ),
+    )
+    if cur.rowcount == 0:
         conn.close()
         return templates.TemplateResponse(
             "reservation_error.html",
@@ -2422,26 +2454,14 @@ async def create_reservation(request: Request) -> HTMLResponse:
                 "selected_date": date_field,
             },
         )
-    # Insertion de la réservation
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur.execute(
-            "INSERT INTO reservations (user_id, court_number, date, start_time, end_time) "
-            "VALUES (%s, %s, %s, %s, %s)",
-            (user.id, court_number, _date.isoformat(), start_time, end_time),
-        )
-    else:
-        cur.execute(
-            "INSERT INTO reservations (user_id, court_number, date, start_time, end_time) "
-            "VALUES (?, ?, ?, ?, ?)",
-            (user.id, court_number, _date.isoformat(), start_time, end_time),
-        )
     # Récupérer l'ID de la réservation créée
     reservation_id = cur.lastrowid
     
     conn.commit()
+    invalidate_reservation_caches(user.id, [date_field])
     conn.close()
     
-    # Envoyer un email de confirmation
+    # Envoyer l'email de confirmation après la réponse, sans bloquer la redirection
     reservation_data = {
         'id': reservation_id,
         'date': _date.strftime('%d/%m/%Y'),
@@ -2449,29 +2469,15 @@ async def create_reservation(request: Request) -> HTMLResponse:
         'end_time': end_time,
         'court_number': court_number
     }
-    
-    # Récupérer les informations de l'utilisateur pour l'email
-    conn = get_db_connection()
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur = conn.cursor()
-        cur.execute("SELECT email, full_name FROM users WHERE id = %s", (user.id,))
-        user_info = cur.fetchone()
-    else:
-        cur = conn.cursor()
-        cur.execute("SELECT email, full_name FROM users WHERE id = ?", (user.id,))
-        user_info = cur.fetchone()
-    conn.close()
-    
-    if user_info:
-        user_email, user_name = user_info
-        send_reservation_confirmation_email(user_email, user_name, reservation_data)
+    if user.email:
+        background_tasks.add_task(send_reservation_confirmation_email, user.email, user.full_name, reservation_data)
     
     redirect_url = f"/reservations?date={_date.isoformat()}"
     return RedirectResponse(url=redirect_url, status_code=303)
 
 
 @app.get("/reservations/{reservation_id}/export-ics")
-async def export_reservation_ics(request: Request, reservation_id: int) -> FileResponse:
+async def export_reservation_ics(request: Request, reservation_id: int) -> Response:
     """Exporte une réservation vers un fichier ICS pour le calendrier personnel."""
     user = get_current_user(request)
     if not user:
@@ -2479,51 +2485,28 @@ async def export_reservation_ics(request: Request, reservation_id: int) -> FileR
     
     conn = get_db_connection()
     
-    # Récupérer les détails de la réservation
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT r.*, u.full_name FROM reservations r JOIN users u ON r.user_id = u.id WHERE r.id = %s",
-            (reservation_id,)
-        )
-        reservation = cur.fetchone()
-    else:
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT r.*, u.full_name FROM reservations r JOIN users u ON r.user_id = u.id WHERE r.id = ?",
-            (reservation_id,)
-        )
-        reservation = cur.fetchone()
-    
+    # Récupérer les détails de la réservation (uniquement les colonnes utilisées)
+    rows, _ = db_execute(
+        conn,
+        "SELECT r.id, r.user_id, r.court_number, r.date, r.start_time, r.end_time, u.full_name "
+        "FROM reservations r JOIN users u ON r.user_id = u.id WHERE r.id = ?",
+        (reservation_id,)
+    )
     conn.close()
     
-    if not reservation:
+    if not rows:
         raise HTTPException(status_code=404, detail="Réservation introuvable")
+    reservation = rows[0]
     
     # Vérifier que l'utilisateur est propriétaire de la réservation ou admin
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        reservation_user_id = reservation[1]  # user_id est à l'index 1
-        reservation_full_name = reservation[5]  # full_name est à l'index 5
-    else:
-        reservation_user_id = reservation['user_id']
-        reservation_full_name = reservation['full_name']
-    
-    if reservation_user_id != user.id and not user.is_admin:
+    if reservation.user_id != user.id and not user.is_admin:
         raise HTTPException(status_code=403, detail="Accès non autorisé")
     
-    # Convertir les données de la réservation
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        # MySQL retourne un tuple
-        date_str = reservation[3]  # date
-        start_time_str = reservation[4]  # start_time
-        end_time_str = reservation[5]  # end_time
-        court_number = reservation[2]  # court_number
-    else:
-        # SQLite retourne un dict
-        date_str = reservation['date']
-        start_time_str = reservation['start_time']
-        end_time_str = reservation['end_time']
-        court_number = reservation['court_number']
+    reservation_full_name = reservation.full_name
+    date_str = reservation.date
+    start_time_str = reservation.start_time
+    end_time_str = reservation.end_time
+    court_number = reservation.court_number
     
     # Parser les dates et heures
     try:
@@ -2559,25 +2542,16 @@ async def export_reservation_ics(request: Request, reservation_id: int) -> FileR
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Erreur de format de date: {e}")
     
-    # Générer le contenu ICS
-    event_title = f"Tennis - Court {court_number}"
-    event_description = f"Réservation de tennis sur le court {court_number} avec {reservation_full_name}"
-    location = "Club Municipal de Tennis Chihia"
-    
-    ics_content = generate_ics_content(event_title, event_description, start_datetime, end_datetime, location)
-    
-    # Créer un fichier temporaire
-    import tempfile
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.ics', delete=False, encoding='utf-8') as f:
-        f.write(ics_content)
-        temp_file_path = f.name
+    # Générer (ou reprendre du cache) le contenu ICS
+    ics_content = build_reservation_ics(
+        reservation.id, court_number, start_datetime, end_datetime, reservation_full_name
+    )
     
-    # Retourner le fichier
-    return FileResponse(
-        path=temp_file_path,
-        filename=f"reservation_tennis_court_{court_number}_{date_str}.ics",
+    # Retourner le contenu directement depuis la mémoire (aucun fichier temporaire)
+    return Response(
+        content=ics_content,
         media_type="text/calendar",
-        headers={"Content-Disposition": f"attachment; filename=reservation_tennis_court_{court_number}_{date_str}.ics"}
+        headers={"Content-Disposition": f'attachment; filename="reservation_tennis_court_{court_number}_{date_str}.ics"'}
     )
 
 
@@ -2585,37 +2559,69 @@ async def export_reservation_ics(request: Request, reservation_id: int) -> FileR
 
 @app.post("/reservations/recurring", response_class=HTMLResponse)
 async def create_recurring_reservation(request: Request) -> HTMLResponse:
-    """Crée une réservation récurrente."""
+    """Crée une réservation récurrente.
+
+    Le créneau est validé comme pour une réservation simple ; au plus
+    MAX_RECURRING_OCCURRENCES occurrences sont générées.
+    """
     user = get_current_user(request)
     if not user or not user.validated:
         return RedirectResponse(url="/connexion", status_code=303)
     
     form = await request.form()
-    court_number = int(form.get("court_number"))
-    start_time = form.get("start_time")
-    end_time = form.get("end_time")
-    frequency = form.get("frequency")  # weekly, biweekly, monthly
-    start_date = form.get("start_date")
-    end_date = form.get("end_date")
+    start_time = str(form.get("start_time", ""))
+    end_time = str(form.get("end_time", ""))
+    frequency = str(form.get("frequency", ""))
+    start_date = str(form.get("start_date", ""))
+    end_date = str(form.get("end_date", ""))
+    
+    court_number, parsed_dates, errors = validate_reservation_slot(
+        str(form.get("court_number", "")), start_time, end_time, start_date, end_date
+    )
+    if frequency not in RECURRING_FREQUENCIES:
+        errors.append("Fréquence invalide.")
+    occurrences: List[date] = []
+    if not errors:
+        if parsed_dates[1] < parsed_dates[0]:
+            errors.append("La date de fin doit être postérieure à la date de début.")
+        else:
+            occurrences = expand_recurrence(parsed_dates[0], parsed_dates[1], frequency)
+    if errors:
+        return FastJSONResponse({"success": False, "message": " ".join(errors)}, status_code=400)
     
     conn = get_db_connection()
+    db_execute_write(
+        conn,
+        "INSERT INTO recurring_reservations (user_id, court_number, start_time, end_time, frequency, start_date, end_date, active) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, 1)",
+        (user.id, court_number, start_time, end_time, frequency, start_date, end_date)
+    )
     
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO recurring_reservations (user_id, court_number, start_time, end_time, frequency, start_date, end_date, active) "
-            "VALUES (%s, %s, %s, %s, %s, %s, %s, 1)",
-            (user.id, court_number, start_time, end_time, frequency, start_date, end_date)
-        )
-    else:
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO recurring_reservations (user_id, court_number, start_time, end_time, frequency, start_date, end_date, active) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, 1)",
-            (user.id, court_number, start_time, end_time, frequency, start_date, end_date)
+    if occurrences:
+        # Dates déjà occupées sur ce court et ce créneau, en une seule requête sur toute la période
+        taken, _ = db_execute(
+            conn,
+            "SELECT DISTINCT date FROM reservations WHERE court_number = ? AND date BETWEEN ? AND ? "
+            "AND start_time < ? AND end_time > ?",
+            (court_number, occurrences[0].isoformat(), occurrences[-1].isoformat(), end_time, start_time)
         )
+        taken_dates = {str(row.date) for row in taken}
+        
+        # Insérer toutes les occurrences libres en un seul lot, dans la même transaction
+        rows = [
+            (user.id, court_number, occurrence.isoformat(), start_time, end_time)
+            for occurrence in occurrences
+            if occurrence.isoformat() not in taken_dates
+        ]
+        if rows:
+            db_execute_many(
+                conn,
+                "INSERT INTO reservations (user_id, court_number, date, start_time, end_time) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
     
     conn.commit()
+    invalidate_reservation_caches(user.id, [occurrence.isoformat() for occurrence in occurrences])
     conn.close()
     
     return RedirectResponse(url=f"/reservations?date={start_date}", status_code=303)
@@ -2631,33 +2637,22 @@ async def cancel_reservation(request: Request, reservation_id: int) -> JSONRespo
     conn = get_db_connection()
     
     # Vérifier que l'utilisateur est propriétaire de la réservation
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur = conn.cursor()
-        cur.execute("SELECT user_id FROM reservations WHERE id = %s", (reservation_id,))
-        reservation = cur.fetchone()
-    else:
-        cur = conn.cursor()
-        cur.execute("SELECT user_id FROM reservations WHERE id = ?", (reservation_id,))
-        reservation = cur.fetchone()
-    
-    if not reservation:
+    rows, _ = db_execute(conn, "SELECT user_id, date FROM reservations WHERE id = ?", (reservation_id,))
+    if not rows:
+        conn.close()
         raise HTTPException(status_code=404, detail="Réservation introuvable")
     
-    reservation_user_id = reservation[0] if hasattr(conn, '_is_mysql') and conn._is_mysql else reservation['user_id']
-    
-    if reservation_user_id != user.id and not user.is_admin:
+    if rows[0].user_id != user.id and not user.is_admin:
+        conn.close()
         raise HTTPException(status_code=403, detail="Accès non autorisé")
     
     # Supprimer la réservation
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur.execute("DELETE FROM reservations WHERE id = %s", (reservation_id,))
-    else:
-        cur.execute("DELETE FROM reservations WHERE id = ?", (reservation_id,))
-    
+    db_execute_write(conn, "DELETE FROM reservations WHERE id = ?", (reservation_id,))
     conn.commit()
+    invalidate_reservation_caches(rows[0].user_id, [str(rows[0].date)])
     conn.close()
     
-    return JSONResponse({"success": True, "message": "Réservation annulée"})
+    return FastJSONResponse({"success": True, "message": "Réservation annulée"})
 
 
 @app.get("/reservations/calendar")
@@ -2670,49 +2665,42 @@ async def get_calendar_data(request: Request) -> JSONResponse:
     start_date = request.query_params.get("start")
     end_date = request.query_params.get("end")
     
-    conn = get_db_connection()
-    
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT r.*, u.full_name FROM reservations r JOIN users u ON r.user_id = u.id "
-            "WHERE date BETWEEN %s AND %s",
-            (start_date, end_date)
-        )
-        reservations = cur.fetchall()
-    else:
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT r.*, u.full_name FROM reservations r JOIN users u ON r.user_id = u.id "
-            "WHERE date BETWEEN ? AND ?",
+    cache_key = (start_date, end_date)
+    events = _calendar_cache.get(cache_key)
+    if events is None:
+        conn = get_db_connection()
+        reservations, _ = db_execute(
+            conn,
+            "SELECT r.id, r.user_id, r.court_number, r.date, r.start_time, r.end_time, u.full_name "
+            "FROM reservations r JOIN users u ON r.user_id = u.id "
+            "WHERE r.date BETWEEN ? AND ?",
             (start_date, end_date)
         )
-        reservations = cur.fetchall()
-    
-    conn.close()
+        conn.close()
+        
+        # Partie commune à tous les utilisateurs, gardée en cache
+        events = [
+            (
+                res.user_id,
+                {
+                    "id": res.id,
+                    "title": f"Court {res.court_number} - {res.full_name}",
+                    "start": f"{res.date}T{res.start_time}:00",
+                    "end": f"{res.date}T{res.end_time}:00",
+                },
+            )
+            for res in reservations
+        ]
+        _calendar_cache.set(cache_key, events)
     
-    # Formater les données pour le calendrier
-    calendar_events = []
-    for res in reservations:
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            event = {
-                "id": res[0],
-                "title": f"Court {res[2]} - {res[5]}",
-                "start": f"{res[3]}T{res[4]}:00",
-                "end": f"{res[3]}T{res[5]}:00",
-                "backgroundColor": "#007bff" if res[1] == user.id else "#6c757d"
-            }
-        else:
-            event = {
-                "id": res['id'],
-                "title": f"Court {res['court_number']} - {res['full_name']}",
-                "start": f"{res['date']}T{res['start_time']}:00",
-                "end": f"{res['date']}T{res['end_time']}:00",
-                "backgroundColor": "#007bff" if res['user_id'] == user.id else "#6c757d"
-            }
-        calendar_events.append(event)
+    # Seule la couleur dépend de l'utilisateur connecté
+    user_id = user.id
+    calendar_events = [
+        {**event, "backgroundColor": "#007bff" if owner_id == user_id else "#6c757d"}
+        for owner_id, event in events
+    ]
     
-    return JSONResponse(calendar_events)
+    return FastJSONResponse(calendar_events)
 
 
 @app.get("/reservations/notifications")
@@ -2723,25 +2711,14 @@ async def get_notifications(request: Request) -> JSONResponse:
         raise HTTPException(status_code=401, detail="Non autorisé")
     
     conn = get_db_connection()
-    
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT * FROM notifications WHERE user_id = %s ORDER BY created_at DESC LIMIT 10",
-            (user.id,)
-        )
-        notifications = cur.fetchall()
-    else:
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT * FROM notifications WHERE user_id = ? ORDER BY created_at DESC LIMIT 10",
-            (user.id,)
-        )
-        notifications = cur.fetchall()
-    
+    notifications, _ = db_execute(
+        conn,
+        "SELECT * FROM notifications WHERE user_id = ? ORDER BY created_at DESC LIMIT 10",
+        (user.id,)
+    )
     conn.close()
     
-    return JSONResponse({"notifications": notifications})
+    return FastJSONResponse({"notifications": [notification.to_dict() for notification in notifications]})
 
 
 @app.post("/reservations/favorites")
@@ -2758,26 +2735,16 @@ async def add_favorite_slot(request: Request) -> JSONResponse:
     day_of_week = form.get("day_of_week")
     
     conn = get_db_connection()
-    
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO favorite_slots (user_id, court_number, start_time, end_time, day_of_week) "
-            "VALUES (%s, %s, %s, %s, %s)",
-            (user.id, court_number, start_time, end_time, day_of_week)
-        )
-    else:
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO favorite_slots (user_id, court_number, start_time, end_time, day_of_week) "
-            "VALUES (?, ?, ?, ?, ?)",
-            (user.id, court_number, start_time, end_time, day_of_week)
-        )
-    
+    db_execute_write(
+        conn,
+        "INSERT INTO favorite_slots (user_id, court_number, start_time, end_time, day_of_week) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (user.id, court_number, start_time, end_time, day_of_week)
+    )
     conn.commit()
     conn.close()
     
-    return JSONResponse({"success": True, "message": "Créneau favori ajouté"})
+    return FastJSONResponse({"success": True, "message": "Créneau favori ajouté"})
 
 
 @app.get("/reservations/stats")
@@ -2787,71 +2754,41 @@ async def get_user_stats(request: Request) -> JSONResponse:
     if not user:
         raise HTTPException(status_code=401, detail="Non autorisé")
     
-    conn = get_db_connection()
-    
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur = conn.cursor()
-        # Statistiques générales
-        cur.execute(
-            "SELECT COUNT(*) as total, COUNT(DISTINCT date) as days, "
-            "COUNT(DISTINCT court_number) as courts FROM reservations WHERE user_id = %s",
-            (user.id,)
-        )
-        general_stats = cur.fetchone()
-        
-        # Statistiques par mois
-        cur.execute(
-            "SELECT DATE_FORMAT(date, '%%Y-%%m') as month, COUNT(*) as count "
-            "FROM reservations WHERE user_id = %s GROUP BY month ORDER BY month DESC LIMIT 12",
-            (user.id,)
-        )
-        monthly_stats = cur.fetchall()
-        
-        # Court préféré
-        cur.execute(
-            "SELECT court_number, COUNT(*) as count FROM reservations WHERE user_id = %s "
-            "GROUP BY court_number ORDER BY count DESC LIMIT 1",
-            (user.id,)
-        )
-        favorite_court = cur.fetchone()
-        
-    else:
-        cur = conn.cursor()
-        # Statistiques générales
-        cur.execute(
-            "SELECT COUNT(*) as total, COUNT(DISTINCT date) as days, "
-            "COUNT(DISTINCT court_number) as courts FROM reservations WHERE user_id = ?",
-            (user.id,)
-        )
-        general_stats = cur.fetchone()
-        
-        # Statistiques par mois
-        cur.execute(
-            "SELECT strftime('%Y-%m', date) as month, COUNT(*) as count "
-            "FROM reservations WHERE user_id = ? GROUP BY month DESC LIMIT 12",
-            (user.id,)
-        )
-        monthly_stats = cur.fetchall()
-        
-        # Court préféré
-        cur.execute(
-            "SELECT court_number, COUNT(*) as count FROM reservations WHERE user_id = ? "
-            "GROUP BY court_number ORDER BY count DESC LIMIT 1",
-            (user.id,)
-        )
-        favorite_court = cur.fetchone()
+    stats = _user_stats_cache.get(user.id)
+    if stats is not None:
+        return FastJSONResponse(stats)
     
+    # Un seul aller-retour : une ligne d'agrégats généraux (court préféré compris)
+    # suivie des douze mois les plus récents, agrégés et limités par la base
+    # (les dates sont au format AAAA-MM-JJ)
+    conn = get_db_connection()
+    rows, _ = db_execute(
+        conn,
+        "SELECT 'total' AS kind, NULL AS month, COUNT(*) AS count, COUNT(DISTINCT date) AS days, "
+        "COUNT(DISTINCT court_number) AS courts, "
+        "(SELECT court_number FROM reservations WHERE user_id = ? "
+        "GROUP BY court_number ORDER BY COUNT(*) DESC, court_number LIMIT 1) AS favorite_court "
+        "FROM reservations WHERE user_id = ? "
+        "UNION ALL "
+        "SELECT kind, month, count, NULL, NULL, NULL FROM ("
+        "SELECT 'month' AS kind, SUBSTR(date, 1, 7) AS month, COUNT(*) AS count FROM reservations "
+        "WHERE user_id = ? GROUP BY month ORDER BY month DESC LIMIT 12) AS recent_months "
+        "ORDER BY kind DESC, month DESC",
+        (user.id, user.id, user.id)
+    )
     conn.close()
     
+    general_stats = rows[0]
     stats = {
-        "total_reservations": general_stats[0] if hasattr(conn, '_is_mysql') and conn._is_mysql else general_stats['total'],
-        "days_played": general_stats[1] if hasattr(conn, '_is_mysql') and conn._is_mysql else general_stats['days'],
-        "courts_used": general_stats[2] if hasattr(conn, '_is_mysql') and conn._is_mysql else general_stats['courts'],
-        "monthly_stats": monthly_stats,
-        "favorite_court": favorite_court[0] if favorite_court else None
+        "total_reservations": general_stats.count,
+        "days_played": general_stats.days,
+        "courts_used": general_stats.courts,
+        "monthly_stats": [[row.month, row.count] for row in rows[1:]],
+        "favorite_court": general_stats.favorite_court
     }
+    _user_stats_cache.set(user.id, stats)
     
-    return JSONResponse(stats)
+    return FastJSONResponse(stats)
 
 
 @app.get("/admin/membres", response_class=HTMLResponse)
@@ -2866,39 +2803,32 @@ async def admin_members(request: Request) -> HTMLResponse:
         return RedirectResponse(url="/connexion", status_code=303)
     check_admin(user)
     
-    # Récupération des paramètres de pagination
-    page = int(request.query_params.get("page", 1))
-    per_page = int(request.query_params.get("per_page", 20))
+    # Récupération des paramètres de pagination (entiers bornés, passés en paramètres liés)
+    try:
+        page = max(1, int(request.query_params.get("page", 1)))
+        per_page = max(1, min(int(request.query_params.get("per_page", 20)), 100))
+    except ValueError:
+        page, per_page = 1, 20
     
     # Calcul des offsets
     offset = (page - 1) * per_page
     
     conn = get_db_connection()
-    cur = conn.cursor()
     
-    # Compter le nombre total de membres
-    cur.execute("SELECT COUNT(*) FROM users")
-    total_members = cur.fetchone()[0]
+    # Compter le nombre total de membres (mis en cache, invalidé à chaque ajout/suppression)
+    total_members = _members_count_cache.get("total")
+    if total_members is None:
+        count_rows, _ = db_execute(conn, "SELECT COUNT(*) AS total FROM users")
+        total_members = count_rows[0].total
+        _members_count_cache.set("total", total_members)
     
     # Récupérer les membres pour la page courante
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        from database import get_mysql_cursor_with_names, convert_mysql_result
-        execute_with_names = get_mysql_cursor_with_names(conn)
-        cur, column_names = execute_with_names(
-            f"SELECT id, username, full_name, email, phone, ijin_number, birth_date, photo_path, is_admin, validated, is_trainer "
-            f"FROM users ORDER BY id LIMIT {per_page} OFFSET {offset}",
-            ()
-        )
-        members = cur.fetchall()
-        # Convertir les tuples MySQL en objets avec attributs nommés
-        members = [convert_mysql_result(member, column_names) for member in members]
-    else:
-        cur.execute(
-            "SELECT id, username, full_name, email, phone, ijin_number, birth_date, photo_path, is_admin, validated, is_trainer "
-            "FROM users ORDER BY id LIMIT ? OFFSET ?",
-            (per_page, offset)
-        )
-        members = cur.fetchall()
+    members, _ = db_execute(
+        conn,
+        "SELECT id, username, full_name, email, phone, ijin_number, birth_date, photo_path, is_admin, validated, is_trainer "
+        "FROM users ORDER BY id LIMIT ? OFFSET ?",
+        (per_page, offset)
+    )
     conn.close()
     
     # Calcul de la pagination
@@ -2954,6 +2884,34 @@ async def admin_add_member_form(request: Request) -> HTMLResponse:
     )
 
 
+def insert_member(values: Tuple[Any, ...], username: str, email: str, phone: str) -> List[str]:
+    """Insère un membre si le nom d'utilisateur, l'email et le téléphone sont libres.
+
+    Fonction synchrone, appelée via asyncio.to_thread.
+
+    Returns:
+        Les messages de conflit (liste vide si le membre a été inséré).
+    """
+    conn = get_db_connection()
+    try:
+        # Insertion conditionnelle : rien n'est inséré si le nom d'utilisateur,
+        # l'email ou le téléphone est déjà utilisé (un seul aller-retour si tout est libre)
+        cur = db_execute_write(
+            conn,
+            "INSERT INTO users (username, password_hash, full_name, email, phone, ijin_number, birth_date, photo_path, is_admin, validated, is_trainer, email_verification_token, email_verified) "
+            "SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ? FROM (SELECT 1 AS one) AS candidate "
+            "WHERE NOT EXISTS (SELECT 1 FROM users WHERE username = ? OR email = ? OR phone = ?)",
+            values + (username, email, phone),
+        )
+        if cur.rowcount == 0:
+            # Cas rare : identifier le ou les champs déjà utilisés pour l'affichage
+            return find_member_conflicts(conn, username, email, phone) or ["Ce membre existe déjà."]
+        conn.commit()
+    finally:
+        conn.close()
+    return []
+
+
 @app.post("/admin/membres/ajouter", response_class=HTMLResponse)
 async def admin_add_member(request: Request) -> HTMLResponse:
     """Traite l'ajout d'un nouveau membre par un administrateur."""
@@ -2999,51 +2957,7 @@ async def admin_add_member(request: Request) -> HTMLResponse:
         if len(password) < 6:
             errors.append("Le mot de passe doit contenir au moins 6 caractères.")
             
-        # Vérifier que le nom d'utilisateur, l'email et le téléphone n'existent pas déjà
-        conn = get_db_connection()
-        
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur = conn.cursor()
-            # Vérifier le nom d'utilisateur
-            cur.execute("SELECT id, username FROM users WHERE username = %s", (username,))
-            existing_user = cur.fetchone()
-            if existing_user:
-                errors.append("Ce nom d'utilisateur est déjà utilisé.")
-            
-            # Vérifier l'email
-            cur.execute("SELECT id, username, email FROM users WHERE email = %s", (email,))
-            existing_email = cur.fetchone()
-            if existing_email:
-                errors.append(f"Cette adresse email ({email}) est déjà utilisée par l'utilisateur '{existing_email[1]}'. Si c'est votre compte, vous pouvez récupérer votre mot de passe.")
-            
-            # Vérifier le téléphone
-            cur.execute("SELECT id, username, phone FROM users WHERE phone = %s", (phone,))
-            existing_phone = cur.fetchone()
-            if existing_phone:
-                errors.append(f"Ce numéro de téléphone ({phone}) est déjà utilisé par l'utilisateur '{existing_phone[1]}'. Si c'est votre compte, vous pouvez récupérer votre mot de passe.")
-        else:
-            cur = conn.cursor()
-            # Vérifier le nom d'utilisateur
-            cur.execute("SELECT id, username FROM users WHERE username = ?", (username,))
-            existing_user = cur.fetchone()
-            if existing_user:
-                errors.append("Ce nom d'utilisateur est déjà utilisé.")
-            
-            # Vérifier l'email
-            cur.execute("SELECT id, username, email FROM users WHERE email = ?", (email,))
-            existing_email = cur.fetchone()
-            if existing_email:
-                errors.append(f"Cette adresse email ({email}) est déjà utilisée par l'utilisateur '{existing_email[1]}'. Si c'est votre compte, vous pouvez récupérer votre mot de passe.")
-            
-            # Vérifier le téléphone
-            cur.execute("SELECT id, username, phone FROM users WHERE phone = ?", (phone,))
-            existing_phone = cur.fetchone()
-            if existing_phone:
-                errors.append(f"Ce numéro de téléphone ({phone}) est déjà utilisé par l'utilisateur '{existing_phone[1]}'. Si c'est votre compte, vous pouvez récupérer votre mot de passe.")
-            
-        if errors:
-            conn.close()
+        def render_form(errors: List[str]) -> HTMLResponse:
             return templates.TemplateResponse(
                 "admin_add_member.html",
                 {
@@ -3061,31 +2975,25 @@ async def admin_add_member(request: Request) -> HTMLResponse:
                     "email_verified": email_verified,
                 },
             )
+        
+        if errors:
+            return render_form(errors)
             
         # Création de l'utilisateur
-        pwd_hash = hash_password(password)
+        pwd_hash = await asyncio.to_thread(hash_password, password)
         is_trainer = 1 if role == "trainer" else 0
         is_admin = 1 if role == "admin" else 0
         
         # Vérification email désactivée - marquer directement comme vérifié
         email_verification_token = None
-        email_verified = 1
         
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur.execute(
-                "INSERT INTO users (username, password_hash, full_name, email, phone, ijin_number, birth_date, photo_path, is_admin, validated, is_trainer, email_verification_token, email_verified) "
-                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
-                (username, pwd_hash, full_name, email, phone, ijin_number, birth_date, "", is_admin, validated, is_trainer, email_verification_token, email_verified),
-            )
-        else:
-            cur.execute(
-                "INSERT INTO users (username, password_hash, full_name, email, phone, ijin_number, birth_date, photo_path, is_admin, validated, is_trainer, email_verification_token, email_verified) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (username, pwd_hash, full_name, email, phone, ijin_number, birth_date, "", is_admin, validated, is_trainer, email_verification_token, email_verified),
-            )
-        conn.commit()
-        conn.close()
+        values = (
+            username, pwd_hash, full_name, email, phone, ijin_number, birth_date, "", is_admin, validated, is_trainer, email_verification_token, 1,
+        )
+        conflicts = await asyncio.to_thread(insert_member, values, username, email, phone)
+        if conflicts:
+            return render_form(conflicts)
+        invalidate_member_caches()
         
         print(f"✅ Membre ajouté avec succès par l'admin: {username}")
         
@@ -3112,58 +3020,81 @@ async def admin_add_member(request: Request) -> HTMLResponse:
         )
 
 
+# Accès base des actions d'administration des membres : fonctions synchrones
+# exécutées via asyncio.to_thread pour ne pas bloquer la boucle d'événements.
+# Les caches sont invalidés par les routes, sur la boucle, après l'appel
+
+def toggle_member_validation(user_id: int) -> Optional[Tuple[int, str, str]]:
+    """Inverse l'état de validation d'un membre.
+
+    Returns:
+        (nouvel état, email, nom complet), ou None si le membre n'existe pas.
+    """
+    conn = get_db_connection()
+    try:
+        # Lire en une fois l'état et les informations utiles à l'email de confirmation
+        rows, _ = db_execute(conn, "SELECT validated, email, full_name FROM users WHERE id = ?", (user_id,))
+        if not rows:
+            return None
+        member = rows[0]
+        new_state = 0 if member.validated else 1
+        db_execute_write(conn, "UPDATE users SET validated = ? WHERE id = ?", (new_state, user_id))
+        conn.commit()
+    finally:
+        conn.close()
+    return new_state, member.email, member.full_name
+
+
+def delete_member(user_id: int) -> int:
+    """Supprime un membre s'il existe et n'est pas administrateur ; retourne 1 si supprimé, sinon 0."""
+    return delete_members([user_id])
+
+
+def delete_members(user_ids: List[int]) -> int:
+    """Supprime les membres non administrateurs parmi user_ids.
+
+    Returns:
+        Le nombre de membres supprimés.
+    """
+    conn = get_db_connection()
+    try:
+        # Une seule requête ; les administrateurs sont exclus par la clause WHERE
+        cur = db_execute_write(
+            conn,
+            f"DELETE FROM users WHERE id IN ({sql_placeholders(len(user_ids))}) AND COALESCE(is_admin, 0) = 0",
+            tuple(user_ids)
+        )
+        conn.commit()
+        deleted = cur.rowcount
+    finally:
+        conn.close()
+    return deleted
+
+
 @app.post("/admin/membres/valider", response_class=HTMLResponse)
-async def validate_member(request: Request) -> HTMLResponse:
+async def validate_member(request: Request, background_tasks: BackgroundTasks) -> HTMLResponse:
     """Action pour valider ou invalider un membre depuis l'interface admin."""
     user = get_current_user(request)
     if not user:
         return RedirectResponse(url="/connexion", status_code=303)
     check_admin(user)
-    raw_body = await request.body()
-    form = urllib.parse.parse_qs(raw_body.decode(), keep_blank_values=True)
+    form = await request.form()
     try:
-        user_id = int(form.get("user_id", ["0"])[0])
+        user_id = int(form.get("user_id") or 0)
     except ValueError:
         return RedirectResponse(url="/admin/membres", status_code=303)
-    conn = get_db_connection()
-    
-    # Vérifier si c'est une connexion MySQL
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur = conn.cursor()
-        cur.execute("SELECT validated FROM users WHERE id = %s", (user_id,))
-        row = cur.fetchone()
-        if row is None:
-            conn.close()
-            raise HTTPException(status_code=404, detail="Utilisateur introuvable")
-        new_state = 0 if row[0] else 1  # MySQL retourne un tuple
-        cur.execute("UPDATE users SET validated = %s WHERE id = %s", (new_state, user_id))
-    else:
-        cur = conn.cursor()
-        cur.execute("SELECT validated FROM users WHERE id = ?", (user_id,))
-        row = cur.fetchone()
-        if row is None:
-            conn.close()
-            raise HTTPException(status_code=404, detail="Utilisateur introuvable")
-        new_state = 0 if row["validated"] else 1
-        cur.execute("UPDATE users SET validated = ? WHERE id = ?", (new_state, user_id))
+    member = await asyncio.to_thread(toggle_member_validation, user_id)
+    if member is None:
+        raise HTTPException(status_code=404, detail="Utilisateur introuvable")
+    invalidate_member_caches()
+    new_state, member_email, member_name = member
     
     # Si le membre vient d'être validé, envoyer un email de confirmation
     if new_state == 1:
-        # Récupérer les informations du membre validé
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur.execute("SELECT email, full_name FROM users WHERE id = %s", (user_id,))
-            member_info = cur.fetchone()
-        else:
-            cur.execute("SELECT email, full_name FROM users WHERE id = ?", (user_id,))
-            member_info = cur.fetchone()
-        
-        if member_info:
-            member_email, member_name = member_info
-            admin_name = user.get("full_name", "l'administrateur")
-            send_member_validation_email(member_email, member_name, admin_name)
+        admin_name = user.get("full_name", "l'administrateur")
+        # Envoyé après la réponse, pour ne pas faire attendre la redirection
+        background_tasks.add_task(send_member_validation_email, member_email, member_name, admin_name)
     
-    conn.commit()
-    conn.close()
     return RedirectResponse(url="/admin/membres", status_code=303)
 
 
@@ -3182,46 +3113,8 @@ async def admin_delete_member(request: Request) -> HTMLResponse:
         if user_id == 0:
             return RedirectResponse(url="/admin/membres", status_code=303)
         
-        conn = get_db_connection()
-        
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur = conn.cursor()
-            
-            # Vérifier que l'utilisateur existe et n'est pas admin
-            cur.execute("SELECT username, is_admin FROM users WHERE id = %s", (user_id,))
-            member = cur.fetchone()
-            
-            if not member:
-                conn.close()
-                return RedirectResponse(url="/admin/membres", status_code=303)
-            
-            if member[1]:  # MySQL retourne un tuple, is_admin est à l'index 1
-                conn.close()
-                return RedirectResponse(url="/admin/membres", status_code=303)
-            
-            # Supprimer l'utilisateur
-            cur.execute("DELETE FROM users WHERE id = %s", (user_id,))
-        else:
-            cur = conn.cursor()
-            
-            # Vérifier que l'utilisateur existe et n'est pas admin
-            cur.execute("SELECT username, is_admin FROM users WHERE id = ?", (user_id,))
-            member = cur.fetchone()
-            
-            if not member:
-                conn.close()
-                return RedirectResponse(url="/admin/membres", status_code=303)
-            
-            if member['is_admin']:
-                conn.close()
-                return RedirectResponse(url="/admin/membres", status_code=303)
-            
-            # Supprimer l'utilisateur
-            cur.execute("DELETE FROM users WHERE id = ?", (user_id,))
-        
-        conn.commit()
-        conn.close()
+        if await asyncio.to_thread(delete_member, user_id):
+            invalidate_member_caches()
         
         return RedirectResponse(url="/admin/membres", status_code=303)
         
@@ -3245,62 +3138,17 @@ async def admin_delete_members_bulk(request: Request) -> HTMLResponse:
         if not user_ids:
             return RedirectResponse(url="/admin/membres", status_code=303)
         
-        # Convertir en entiers et filtrer les valeurs invalides
-        valid_user_ids = []
-        for user_id_str in user_ids:
-            try:
-                user_id = int(user_id_str)
-                if user_id > 0:
-                    valid_user_ids.append(user_id)
-            except ValueError:
-                continue
+        # Convertir en entiers et filtrer les valeurs invalides (isdecimal accepte
+        # exactement ce que int() sait lire, sans exception à intercepter)
+        valid_user_ids = [int(value) for value in user_ids if value.isdecimal() and int(value) > 0]
         
         if not valid_user_ids:
             return RedirectResponse(url="/admin/membres", status_code=303)
         
-        conn = get_db_connection()
-        
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur = conn.cursor()
-            
-            # Vérifier que les utilisateurs existent et ne sont pas admin
-            placeholders = ','.join(['%s' for _ in valid_user_ids])
-            cur.execute(f"SELECT id, username, is_admin FROM users WHERE id IN ({placeholders})", valid_user_ids)
-            members = cur.fetchall()
-            
-            # Filtrer les membres non-admin (MySQL retourne des tuples)
-            non_admin_members = [m for m in members if not m[2]]  # is_admin est à l'index 2
-            non_admin_ids = [m[0] for m in non_admin_members]  # id est à l'index 0
-            
-            if non_admin_ids:
-                # Supprimer les membres non-admin
-                placeholders = ','.join(['%s' for _ in non_admin_ids])
-                cur.execute(f"DELETE FROM users WHERE id IN ({placeholders})", non_admin_ids)
-                conn.commit()
-                
-                print(f"✅ {len(non_admin_ids)} membres supprimés en lot")
-        else:
-            cur = conn.cursor()
-            
-            # Vérifier que les utilisateurs existent et ne sont pas admin
-            placeholders = ','.join(['?' for _ in valid_user_ids])
-            cur.execute(f"SELECT id, username, is_admin FROM users WHERE id IN ({placeholders})", valid_user_ids)
-            members = cur.fetchall()
-            
-            # Filtrer les membres non-admin
-            non_admin_members = [m for m in members if not m['is_admin']]
-            non_admin_ids = [m['id'] for m in non_admin_members]
-            
-            if non_admin_ids:
-                # Supprimer les membres non-admin
-                placeholders = ','.join(['?' for _ in non_admin_ids])
-                cur.execute(f"DELETE FROM users WHERE id IN ({placeholders})", non_admin_ids)
-                conn.commit()
-                
-                print(f"✅ {len(non_admin_ids)} membres supprimés en lot")
-        
-        conn.close()
+        deleted = await asyncio.to_thread(delete_members, valid_user_ids)
+        if deleted:
+            invalidate_member_caches()
+            print(f"✅ {deleted} membres supprimés en lot")
         
         return RedirectResponse(url="/admin/membres", status_code=303)
         
@@ -3309,6 +3157,50 @@ async def admin_delete_members_bulk(request: Request) -> HTMLResponse:
         return RedirectResponse(url="/admin/membres", status_code=303)
 
 
+# Contenu du modal de détail d'un membre, compilé une fois ; l'environnement
+# Jinja de l'application échappe automatiquement les valeurs
+MEMBER_DETAILS_TEMPLATE = templates.env.from_string("""
+        <div class="member-details-content">
+            <div class="row">
+                <div class="col-md-6">
+                    <h6>Informations personnelles</h6>
+                    <p><strong>Nom complet:</strong> {{ member.full_name or '' }}</p>
+                    <p><strong>Nom d'utilisateur:</strong> {{ member.username or '' }}</p>
+                    <p><strong>Email:</strong> {{ member.email or 'Non renseigné' }}</p>
+                    <p><strong>Téléphone:</strong> {{ member.phone or 'Non renseigné' }}</p>
+                </div>
+                <div class="col-md-6">
+                    <h6>Informations supplémentaires</h6>
+                    <p><strong>Numéro IJIN:</strong> {{ member.ijin_number or 'Non renseigné' }}</p>
+                    <p><strong>Date de naissance:</strong> {{ member.birth_date or 'Non renseignée' }}</p>
+                    <p><strong>Rôle:</strong> {{ 'Administrateur' if member.is_admin else 'Entraîneur' if member.is_trainer else 'Membre' }}</p>
+                    <p><strong>Statut:</strong> {{ 'Validé' if member.validated else 'En attente' }}</p>
+                </div>
+            </div>
+        </div>
+        """)
+
+
+# Colonnes affichées par le détail et le formulaire d'édition d'un membre
+# (jamais password_hash ni les jetons)
+MEMBER_FORM_COLUMNS = (
+    "id, username, full_name, email, phone, ijin_number, birth_date, is_admin, is_trainer, validated"
+)
+
+
+def fetch_member_by_id(member_id: int, columns: str = MEMBER_FORM_COLUMNS) -> Optional[Any]:
+    """Retourne les colonnes demandées d'un membre, ou None s'il n'existe pas.
+
+    Fonction synchrone, appelée via asyncio.to_thread.
+    """
+    conn = get_db_connection()
+    try:
+        rows, _ = db_execute(conn, f"SELECT {columns} FROM users WHERE id = ?", (member_id,))
+    finally:
+        conn.close()
+    return rows[0] if rows else None
+
+
 @app.get("/admin/membres/{member_id}/details")
 async def admin_member_details(request: Request, member_id: int):
     """Retourne les détails d'un membre en JSON pour le modal."""
@@ -3318,46 +3210,12 @@ async def admin_member_details(request: Request, member_id: int):
     check_admin(user)
     
     try:
-        conn = get_db_connection()
-        
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            from database import get_mysql_cursor_with_names, convert_mysql_result
-            execute_with_names = get_mysql_cursor_with_names(conn)
-            cur, column_names = execute_with_names("SELECT * FROM users WHERE id = %s", (member_id,))
-            member = cur.fetchone()
-            member = convert_mysql_result(member, column_names)
-        else:
-            cur = conn.cursor()
-            cur.execute("SELECT * FROM users WHERE id = ?", (member_id,))
-            member = cur.fetchone()
-        
-        conn.close()
-        
-        if not member:
+        member = await asyncio.to_thread(fetch_member_by_id, member_id)
+        if member is None:
             return {"status": "error", "message": "Membre non trouvé"}
         
         # Générer le HTML pour le modal
-        html = f"""
-        <div class="member-details-content">
-            <div class="row">
-                <div class="col-md-6">
-                    <h6>Informations personnelles</h6>
-                    <p><strong>Nom complet:</strong> {member['full_name']}</p>
-                    <p><strong>Nom d'utilisateur:</strong> {member['username']}</p>
-                    <p><strong>Email:</strong> {member['email'] or 'Non renseigné'}</p>
-                    <p><strong>Téléphone:</strong> {member['phone'] or 'Non renseigné'}</p>
-                </div>
-                <div class="col-md-6">
-                    <h6>Informations supplémentaires</h6>
-                    <p><strong>Numéro IJIN:</strong> {member['ijin_number'] or 'Non renseigné'}</p>
-                    <p><strong>Date de naissance:</strong> {member['birth_date'] or 'Non renseignée'}</p>
-                    <p><strong>Rôle:</strong> {'Administrateur' if member['is_admin'] else 'Entraîneur' if member['is_trainer'] else 'Membre'}</p>
-                    <p><strong>Statut:</strong> {'Validé' if member['validated'] else 'En attente'}</p>
-                </div>
-            </div>
-        </div>
-        """
+        html = MEMBER_DETAILS_TEMPLATE.render(member=member)
         
         return {"status": "success", "html": html}
         
@@ -3374,23 +3232,8 @@ async def admin_edit_member_form(request: Request, member_id: int) -> HTMLRespon
     check_admin(user)
     
     try:
-        conn = get_db_connection()
-        
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            from database import get_mysql_cursor_with_names, convert_mysql_result
-            execute_with_names = get_mysql_cursor_with_names(conn)
-            cur, column_names = execute_with_names("SELECT * FROM users WHERE id = %s", (member_id,))
-            member = cur.fetchone()
-            member = convert_mysql_result(member, column_names)
-        else:
-            cur = conn.cursor()
-            cur.execute("SELECT * FROM users WHERE id = ?", (member_id,))
-            member = cur.fetchone()
-        
-        conn.close()
-        
-        if not member:
+        member = await asyncio.to_thread(fetch_member_by_id, member_id)
+        if member is None:
             raise HTTPException(status_code=404, detail="Membre non trouvé")
         
         return templates.TemplateResponse(
@@ -3408,6 +3251,55 @@ async def admin_edit_member_form(request: Request, member_id: int) -> HTMLRespon
         return RedirectResponse(url="/admin/membres", status_code=303)
 
 
+# Requêtes de mise à jour d'un membre, avec ou sans changement de mot de passe
+UPDATE_MEMBER_SQL = (
+    "UPDATE users SET username = ?, full_name = ?, email = ?, phone = ?, ijin_number = ?, "
+    "birth_date = ?, is_admin = ?, validated = ?, is_trainer = ? WHERE id = ?"
+)
+UPDATE_MEMBER_SQL_WITH_PASSWORD = (
+    "UPDATE users SET username = ?, full_name = ?, email = ?, phone = ?, ijin_number = ?, "
+    "birth_date = ?, is_admin = ?, validated = ?, is_trainer = ?, password_hash = ? WHERE id = ?"
+)
+
+
+def fetch_member_for_update(member_id: int, username: str) -> Optional[Any]:
+    """Charge un membre et indique si ``username`` est déjà pris par un autre membre.
+
+    Fonction synchrone, appelée via asyncio.to_thread.
+
+    Returns:
+        La ligne du membre (avec la colonne username_taken), ou None s'il n'existe pas.
+    """
+    conn = get_db_connection()
+    try:
+        rows, _ = db_execute(
+            conn,
+            f"SELECT {MEMBER_FORM_COLUMNS}, "
+            "EXISTS(SELECT 1 FROM users d WHERE d.username = ? AND d.id != users.id) AS username_taken "
+            "FROM users WHERE users.id = ?",
+            (username, member_id)
+        )
+    finally:
+        conn.close()
+    return rows[0] if rows else None
+
+
+def update_member(member_id: int, values: Tuple[Any, ...], pwd_hash: Optional[str]) -> None:
+    """Met à jour un membre ; le hash n'est écrit que si un nouveau mot de passe est fourni.
+
+    Fonction synchrone, appelée via asyncio.to_thread.
+    """
+    conn = get_db_connection()
+    try:
+        if pwd_hash:
+            db_execute_write(conn, UPDATE_MEMBER_SQL_WITH_PASSWORD, values + (pwd_hash, member_id))
+        else:
+            db_execute_write(conn, UPDATE_MEMBER_SQL, values + (member_id,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
 @app.post("/admin/membres/{member_id}/edit", response_class=HTMLResponse)
 async def admin_edit_member(request: Request, member_id: int) -> HTMLResponse:
     """Traite la soumission du formulaire d'édition d'un membre."""
@@ -3439,34 +3331,20 @@ async def admin_edit_member(request: Request, member_id: int) -> HTMLResponse:
         if not full_name:
             errors.append("Le nom complet est obligatoire.")
         
-        # Vérifier que le nom d'utilisateur n'existe pas déjà (sauf pour le membre actuel)
-        conn = get_db_connection()
+        if new_password and len(new_password) < 6:
+            errors.append("Le mot de passe doit contenir au moins 6 caractères.")
         
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur = conn.cursor()
-            cur.execute("SELECT id FROM users WHERE username = %s AND id != %s", (username, member_id))
-        else:
-            cur = conn.cursor()
-            cur.execute("SELECT id FROM users WHERE username = ? AND id != ?", (username, member_id))
+        # Charger le membre et vérifier que le nom d'utilisateur n'est pas pris
+        # par un autre membre, en un seul aller-retour
+        member = await asyncio.to_thread(fetch_member_for_update, member_id, username)
+        if member is None:
+            return RedirectResponse(url="/admin/membres", status_code=303)
         
-        if cur.fetchone():
+        if member.username_taken:
             errors.append("Ce nom d'utilisateur est déjà utilisé par un autre membre.")
         
         if errors:
-            # Récupérer les données du membre pour réafficher le formulaire
-            if hasattr(conn, '_is_mysql') and conn._is_mysql:
-                from database import get_mysql_cursor_with_names, convert_mysql_result
-                execute_with_names = get_mysql_cursor_with_names(conn)
-                cur, column_names = execute_with_names("SELECT * FROM users WHERE id = %s", (member_id,))
-                member = cur.fetchone()
-                member = convert_mysql_result(member, column_names)
-            else:
-                cur.execute("SELECT * FROM users WHERE id = ?", (member_id,))
-                member = cur.fetchone()
-            
-            conn.close()
-            
+            # Réafficher le formulaire avec le membre déjà chargé
             return templates.TemplateResponse(
                 "admin_member_edit.html",
                 {
@@ -3477,88 +3355,13 @@ async def admin_edit_member(request: Request, member_id: int) -> HTMLResponse:
                 },
             )
         
-        # Mise à jour du membre
-        update_fields = []
-        update_values = []
-        
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            update_fields.append("username = %s")
-            update_fields.append("full_name = %s")
-            update_fields.append("email = %s")
-            update_fields.append("phone = %s")
-            update_fields.append("ijin_number = %s")
-            update_fields.append("birth_date = %s")
-            update_fields.append("is_admin = %s")
-            update_fields.append("validated = %s")
-            update_fields.append("is_trainer = %s")
-        else:
-            update_fields.append("username = ?")
-            update_fields.append("full_name = ?")
-            update_fields.append("email = ?")
-            update_fields.append("phone = ?")
-            update_fields.append("ijin_number = ?")
-            update_fields.append("birth_date = ?")
-            update_fields.append("is_admin = ?")
-            update_fields.append("validated = ?")
-            update_fields.append("is_trainer = ?")
-        
-        update_values.append(username)
-        update_values.append(full_name)
-        update_values.append(email)
-        update_values.append(phone)
-        update_values.append(ijin_number)
-        update_values.append(birth_date)
-        update_values.append(1 if is_admin else 0)
-        update_values.append(1 if validated else 0)
-        update_values.append(1 if is_trainer else 0)
-        
-        # Si un nouveau mot de passe est fourni
-        if new_password:
-            if len(new_password) < 6:
-                errors.append("Le mot de passe doit contenir au moins 6 caractères.")
-            else:
-                if hasattr(conn, '_is_mysql') and conn._is_mysql:
-                    update_fields.append("password_hash = %s")
-                else:
-                    update_fields.append("password_hash = ?")
-                update_values.append(hash_password(new_password))
-        
-        if errors:
-            # Récupérer les données du membre pour réafficher le formulaire
-            if hasattr(conn, '_is_mysql') and conn._is_mysql:
-                from database import get_mysql_cursor_with_names, convert_mysql_result
-                execute_with_names = get_mysql_cursor_with_names(conn)
-                cur, column_names = execute_with_names("SELECT * FROM users WHERE id = %s", (member_id,))
-                member = cur.fetchone()
-                member = convert_mysql_result(member, column_names)
-            else:
-                cur.execute("SELECT * FROM users WHERE id = ?", (member_id,))
-                member = cur.fetchone()
-            
-                conn.close()
-            
-                return templates.TemplateResponse(
-                "admin_member_edit.html",
-                    {
-                        "request": request,
-                    "user": user,
-                    "member": member,
-                    "errors": errors
-                },
-            )
-        
-        # Ajouter l'ID du membre à la fin pour la clause WHERE
-        update_values.append(member_id)
-        
-        # Exécuter la mise à jour
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            query = f"UPDATE users SET {', '.join(update_fields)} WHERE id = %s"
-        else:
-            query = f"UPDATE users SET {', '.join(update_fields)} WHERE id = ?"
-        
-        cur.execute(query, update_values)
-        conn.commit()
-        conn.close()
+        # Mise à jour du membre (le hash n'est ajouté que si un nouveau mot de passe est fourni)
+        values = (username, full_name, email, phone, ijin_number, birth_date,
+                  int(is_admin), int(validated), int(is_trainer))
+        # Le hachage est calculé avant d'emprunter une connexion au pool
+        pwd_hash = await asyncio.to_thread(hash_password, new_password) if new_password else None
+        await asyncio.to_thread(update_member, member_id, values, pwd_hash)
+        invalidate_member_caches()
         
         print(f"✅ Membre {username} mis à jour avec succès")
         
@@ -3569,6 +3372,45 @@ async def admin_edit_member(request: Request, member_id: int) -> HTMLResponse:
         return RedirectResponse(url="/admin/membres", status_code=303)
 
 
+def fetch_admin_reservations_page(page: int, per_page: int) -> Tuple[list, int]:
+    """Retourne les réservations d'une page de l'administration et leur nombre total.
+
+    Fonction synchrone, appelée via asyncio.to_thread.
+    """
+    offset = (page - 1) * per_page
+    conn = get_db_connection()
+
+    # Page courante et nombre total en un seul aller-retour : la sous-requête scalaire
+    # remplace COUNT(*) OVER(), absent de MySQL 5.7. Dates et heures sont mises en forme
+    # par SUBSTR (YYYY-MM-DD, HH:MM) quel que soit le type de colonne.
+    bookings, _ = db_execute(
+        conn,
+        """
+            SELECT r.id, r.court_number,
+                   SUBSTR(r.date, 1, 10) AS date,
+                   SUBSTR(r.start_time, 1, 5) AS start_time,
+                   SUBSTR(r.end_time, 1, 5) AS end_time,
+                   u.username, u.full_name as user_full_name,
+                   (SELECT COUNT(*) FROM reservations) AS total_count
+            FROM reservations r 
+            JOIN users u ON r.user_id = u.id 
+            ORDER BY r.date DESC, r.start_time DESC 
+            LIMIT ? OFFSET ?
+        """,
+        (per_page, offset)
+    )
+    if bookings:
+        total_bookings = bookings[0].total_count
+    elif page > 1:
+        # Page au-delà de la fin : le total n'est pas porté par les lignes
+        count_rows, _ = db_execute(conn, "SELECT COUNT(*) AS total FROM reservations")
+        total_bookings = count_rows[0].total
+    else:
+        total_bookings = 0
+    conn.close()
+    return bookings, total_bookings
+
+
 @app.get("/admin/reservations", response_class=HTMLResponse)
 async def admin_reservations(request: Request) -> HTMLResponse:
     """Affiche toutes les réservations pour les administrateurs avec pagination."""
@@ -3591,62 +3433,10 @@ async def admin_reservations(request: Request) -> HTMLResponse:
                 )
             
         # 3. Récupération des paramètres de pagination
-        page = int(request.query_params.get("page", 1))
-        per_page = int(request.query_params.get("per_page", 20))
-            
-        # Calcul des offsets
-        offset = (page - 1) * per_page
-        
-        conn = get_db_connection()
-        cur = conn.cursor()
-                
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            from database import get_mysql_cursor_with_names, convert_mysql_result
-            execute_with_names = get_mysql_cursor_with_names(conn)
-            
-            # Compter le nombre total de réservations
-            cur = conn.cursor()
-            cur.execute("SELECT COUNT(*) FROM reservations")
-            total_bookings = cur.fetchone()[0]
-            
-            # Récupérer les réservations pour la page courante avec informations utilisateur
-            cur, column_names = execute_with_names(f"""
-                SELECT r.*, u.username, u.full_name as user_full_name 
-                FROM reservations r 
-                JOIN users u ON r.user_id = u.id 
-                ORDER BY r.date DESC, r.start_time DESC 
-                LIMIT {per_page} OFFSET {offset}
-            """, ())
-            bookings = cur.fetchall()
-            # Convertir les tuples MySQL en objets avec attributs nommés
-            bookings = [convert_mysql_result(booking, column_names) for booking in bookings]
-        else:
-            cur = conn.cursor()
-            
-            # Compter le nombre total de réservations
-            cur.execute("SELECT COUNT(*) FROM reservations")
-            total_bookings = cur.fetchone()[0]
-            
-            # Récupérer les réservations pour la page courante avec informations utilisateur
-            cur.execute("""
-                SELECT r.*, u.username, u.full_name as user_full_name 
-                FROM reservations r 
-                JOIN users u ON r.user_id = u.id 
-                ORDER BY r.date DESC, r.start_time DESC 
-                LIMIT ? OFFSET ?
-            """, (per_page, offset))
-            bookings = cur.fetchall()
-        conn.close()
+        page = max(1, int(request.query_params.get("page", 1)))
+        per_page = max(1, min(int(request.query_params.get("per_page", 20)), 100))
         
-        # Convertir les dates en chaînes pour la compatibilité avec le template
-        for booking in bookings:
-            if hasattr(booking.date, 'isoformat'):
-                booking.date = booking.date.isoformat()
-            if hasattr(booking.start_time, 'strftime'):
-                booking.start_time = booking.start_time.strftime('%H:%M')
-            if hasattr(booking.end_time, 'strftime'):
-                booking.end_time = booking.end_time.strftime('%H:%M')
+        bookings, total_bookings = await asyncio.to_thread(fetch_admin_reservations_page, page, per_page)
         
         # Calcul de la pagination
         total_pages = max(1, (total_bookings + per_page - 1) // per_page)
@@ -3707,85 +3497,55 @@ async def admin_delete_reservation(request: Request) -> HTMLResponse:
     if not user:
         return RedirectResponse(url="/connexion", status_code=303)
     check_admin(user)
-    raw_body = await request.body()
-    form = urllib.parse.parse_qs(raw_body.decode(), keep_blank_values=True)
+    form = await request.form()
     try:
-        booking_id = int(form.get("booking_id", ["0"])[0])
+        booking_id = int(form.get("booking_id") or 0)
     except ValueError:
         return RedirectResponse(url="/admin/reservations", status_code=303)
-    conn = get_db_connection()
-    
-    # Vérifier si c'est une connexion MySQL
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM reservations WHERE id = %s", (booking_id,))
-    else:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM reservations WHERE id = ?", (booking_id,))
-    
-    conn.commit()
-    conn.close()
+    if await asyncio.to_thread(delete_reservations, [booking_id]):
+        invalidate_reservation_caches()
     return RedirectResponse(url="/admin/reservations", status_code=303)
 
 
-@app.post("/admin/reservations/supprimer-lot", response_class=HTMLResponse)
-async def admin_delete_reservations_bulk(request: Request) -> HTMLResponse:
-    """Permet à un administrateur de supprimer plusieurs réservations en lot."""
-    user = get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/connexion", status_code=303)
-    check_admin(user)
-    
+# Nombre maximal d'identifiants par clause IN (SQLite limite le nombre de paramètres)
+SQL_IN_CHUNK_SIZE = 500
+
+
+def delete_reservations(reservation_ids: List[int]) -> int:
+    """Supprime des réservations par lots de SQL_IN_CHUNK_SIZE, en une seule transaction.
+
+    Fonction synchrone, appelée via asyncio.to_thread.
+
+    Returns:
+        Le nombre de réservations supprimées.
+    """
+    deleted = 0
+    conn = get_db_connection()
     try:
-        form_data = await request.form()
-        booking_ids = form_data.getlist("booking_ids")
-        
-        if not booking_ids:
-            return RedirectResponse(url="/admin/reservations", status_code=303)
-        
-        # Convertir en entiers et valider
-        valid_ids = []
-        for booking_id in booking_ids:
-            try:
-                valid_ids.append(int(booking_id))
-            except ValueError:
-                continue
-        
-        if not valid_ids:
-            return RedirectResponse(url="/admin/reservations", status_code=303)
-        
-        # Supprimer les réservations
-        conn = get_db_connection()
-        
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur = conn.cursor()
-            
-            # Utiliser une requête avec IN pour supprimer en lot
-            placeholders = ','.join(['%s' for _ in valid_ids])
-            cur.execute(f"DELETE FROM reservations WHERE id IN ({placeholders})", valid_ids)
-        else:
-            cur = conn.cursor()
-            
-            # Utiliser une requête avec IN pour supprimer en lot
-            placeholders = ','.join(['?' for _ in valid_ids])
-            cur.execute(f"DELETE FROM reservations WHERE id IN ({placeholders})", valid_ids)
-        
-        deleted_count = cur.rowcount
+        for start in range(0, len(reservation_ids), SQL_IN_CHUNK_SIZE):
+            part = reservation_ids[start:start + SQL_IN_CHUNK_SIZE]
+            cur = db_execute_write(
+                conn,
+                f"DELETE FROM reservations WHERE id IN ({sql_placeholders(len(part))})",
+                tuple(part)
+            )
+            deleted += cur.rowcount
         conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
         conn.close()
-        
-        print(f"✅ {deleted_count} réservation(s) supprimée(s) en lot")
-        
-    except Exception as e:
-        print(f"❌ Erreur lors de la suppression en lot: {e}")
-    
-    return RedirectResponse(url="/admin/reservations", status_code=303)
+    return deleted
 
 
-@app.post("/admin/reservations/annuler-lot", response_class=HTMLResponse)
-async def admin_cancel_reservations_bulk(request: Request) -> HTMLResponse:
-    """Permet à un administrateur d'annuler plusieurs réservations en lot (les supprime)."""
+async def bulk_delete_reservations_from_form(request: Request, action: str) -> HTMLResponse:
+    """Supprime les réservations cochées dans le formulaire d'administration.
+
+    Args:
+        request: requête contenant les champs booking_ids.
+        action: verbe utilisé dans les messages ("supprimée", "annulée").
+    """
     user = get_current_user(request)
     if not user:
         return RedirectResponse(url="/connexion", status_code=303)
@@ -3793,63 +3553,51 @@ async def admin_cancel_reservations_bulk(request: Request) -> HTMLResponse:
     
     try:
         form_data = await request.form()
-        booking_ids = form_data.getlist("booking_ids")
-        
-        if not booking_ids:
-            return RedirectResponse(url="/admin/reservations", status_code=303)
         
         # Convertir en entiers et valider
-        valid_ids = []
-        for booking_id in booking_ids:
-            try:
-                valid_ids.append(int(booking_id))
-            except ValueError:
-                continue
+        valid_ids = list(map(int, filter(str.isdecimal, form_data.getlist("booking_ids"))))
         
-        if not valid_ids:
-            return RedirectResponse(url="/admin/reservations", status_code=303)
-        
-        # Supprimer les réservations (annulation = suppression)
-        conn = get_db_connection()
-        
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur = conn.cursor()
-            
-            # Utiliser une requête avec IN pour supprimer en lot
-            placeholders = ','.join(['%s' for _ in valid_ids])
-            cur.execute(f"DELETE FROM reservations WHERE id IN ({placeholders})", valid_ids)
-        else:
-            cur = conn.cursor()
-            
-            # Utiliser une requête avec IN pour supprimer en lot
-            placeholders = ','.join(['?' for _ in valid_ids])
-            cur.execute(f"DELETE FROM reservations WHERE id IN ({placeholders})", valid_ids)
-        
-        cancelled_count = cur.rowcount
-        conn.commit()
-        conn.close()
-        
-        print(f"✅ {cancelled_count} réservation(s) annulée(s) en lot")
+        if valid_ids:
+            count = await asyncio.to_thread(delete_reservations, valid_ids)
+            invalidate_reservation_caches()
+            print(f"✅ {count} réservation(s) {action}(s) en lot")
         
     except Exception as e:
-        print(f"❌ Erreur lors de l'annulation en lot: {e}")
+        print(f"❌ Erreur lors du traitement en lot ({action}): {e}")
     
     return RedirectResponse(url="/admin/reservations", status_code=303)
 
 
-@app.get("/admin/reservations/export")
-async def admin_export_reservations(request: Request):
-    """Exporte toutes les réservations au format CSV."""
-    user = get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/connexion", status_code=303)
-    check_admin(user)
+@app.post("/admin/reservations/supprimer-lot", response_class=HTMLResponse)
+async def admin_delete_reservations_bulk(request: Request) -> HTMLResponse:
+    """Permet à un administrateur de supprimer plusieurs réservations en lot."""
+    return await bulk_delete_reservations_from_form(request, "supprimée")
+
+
+@app.post("/admin/reservations/annuler-lot", response_class=HTMLResponse)
+async def admin_cancel_reservations_bulk(request: Request) -> HTMLResponse:
+    """Permet à un administrateur d'annuler plusieurs réservations en lot (les supprime)."""
+    return await bulk_delete_reservations_from_form(request, "annulée")
+
+
+# Taille des lots lus en base et écrits dans chaque morceau du CSV exporté
+CSV_EXPORT_BATCH_SIZE = 1000
+
+
+def iter_reservations_csv():
+    """Produit l'export CSV des réservations par lots, sans charger toute la table.
+
+    Générateur synchrone : StreamingResponse l'itère dans le pool de threads,
+    la connexion est rendue à la fin du parcours ou si le client se déconnecte.
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["ID", "Date", "Début", "Fin", "Court", "Utilisateur", "Nom complet", "Email", "Téléphone"])
+    yield buffer.getvalue()
     
+    conn = get_db_connection()
     try:
-        conn = get_db_connection()
         cur = conn.cursor()
-        
         # Récupérer toutes les réservations avec les informations utilisateur
         cur.execute("""
             SELECT r.id, r.date, r.start_time, r.end_time, r.court_number,
@@ -3858,28 +3606,42 @@ async def admin_export_reservations(request: Request):
             JOIN users u ON r.user_id = u.id 
             ORDER BY r.date DESC, r.start_time DESC
         """)
-        reservations = cur.fetchall()
+        while True:
+            rows = cur.fetchmany(CSV_EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            buffer.seek(0)
+            buffer.truncate(0)
+            writer.writerows(
+                (res[0], res[1], res[2], res[3], res[4], res[5], res[6], res[7] or "", res[8] or "")
+                for res in rows
+            )
+            yield buffer.getvalue()
+    except Exception:
+        # Relancer pour interrompre le téléchargement : un CSV tronqué ne doit
+        # pas passer pour un export complet
+        log.exception("❌ Erreur lors de l'export des réservations")
+        raise
+    finally:
         conn.close()
-        
-        # Créer le contenu CSV
-        csv_content = "ID,Date,Début,Fin,Court,Utilisateur,Nom complet,Email,Téléphone\n"
-        
-        for res in reservations:
-            csv_content += f"{res[0]},{res[1]},{res[2]},{res[3]},{res[4]},{res[5]},{res[6]},{res[7] or ''},{res[8] or ''}\n"
-        
-        # Générer le nom de fichier avec la date
-        from datetime import datetime
-        filename = f"reservations_cmtch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        
-        return Response(
-            content=csv_content,
-            media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
-        
-    except Exception as e:
-        print(f"❌ Erreur lors de l'export: {e}")
-    return RedirectResponse(url="/admin/reservations", status_code=303)
+
+
+@app.get("/admin/reservations/export")
+async def admin_export_reservations(request: Request):
+    """Exporte toutes les réservations au format CSV."""
+    user = get_current_user(request)
+    if not user:
+        return RedirectResponse(url="/connexion", status_code=303)
+    check_admin(user)
+    
+    # Générer le nom de fichier avec la date
+    filename = f"reservations_cmtch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    
+    return StreamingResponse(
+        iter_reservations_csv(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
 
 @app.exception_handler(HTTPException)
@@ -3903,6 +3665,50 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> HTMLRe
 #  Section Articles
 # -----------------------------------------------------------------------------
 
+# La liste n'affiche qu'un extrait du contenu (150 caractères dans articles.html) :
+# seul le début de la colonne est lu
+ARTICLE_EXCERPT_LENGTH = 300
+
+# Nombre total d'articles publiés, pour la pagination de /articles
+_articles_count_cache = TTLCache(maxsize=1, ttl=300)
+
+
+def invalidate_article_caches() -> None:
+    """Vide les caches dérivés de la table articles après une modification."""
+    _articles_count_cache.clear()
+
+
+def insert_articles(conn, rows: List[Tuple[str, str, Optional[str], str]]) -> None:
+    """Insère des articles (title, content, image_path, created_at) sans valider la transaction.
+
+    Toutes les lignes passent par un seul appel executemany, que mysql-connector
+    réécrit en INSERT multi-lignes découpé selon max_allowed_packet.
+    """
+    db_execute_many(
+        conn,
+        "INSERT INTO articles (title, content, image_path, created_at) VALUES (?, ?, ?, ?)",
+        rows,
+    )
+
+
+def encode_article_cursor(created_at: Any, article_id: int) -> str:
+    """Encode la position (created_at, id) d'un article en jeton opaque pour l'URL."""
+    raw = f"{created_at}|{article_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_article_cursor(token: Optional[str]) -> Optional[Tuple[str, int]]:
+    """Décode un jeton produit par encode_article_cursor, ou None s'il est absent ou invalide."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("utf-8")
+        created_at, article_id = raw.rsplit("|", 1)
+        return created_at, int(article_id)
+    except ValueError:
+        return None
+
+
 @app.get("/articles", response_class=HTMLResponse)
 async def articles_list(request: Request) -> HTMLResponse:
     """Affiche la liste des articles publiés avec pagination.
@@ -3918,51 +3724,51 @@ async def articles_list(request: Request) -> HTMLResponse:
     """
     try:
         # Récupération des paramètres de pagination
-        page = int(request.query_params.get("page", 1))
-        per_page = int(request.query_params.get("per_page", 6))  # 6 articles par page
-        
-        # Calcul des offsets
-        offset = (page - 1) * per_page
+        page = max(1, int(request.query_params.get("page", 1)))
+        per_page = max(1, min(int(request.query_params.get("per_page", 6)), 50))  # 6 articles par page
+        after = decode_article_cursor(request.query_params.get("cursor"))
         
         conn = get_db_connection()
         
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            from database import get_mysql_cursor_with_names, convert_mysql_result
-            execute_with_names = get_mysql_cursor_with_names(conn)
-            
-            # Compter le nombre total d'articles
-            cur = conn.cursor()
-            cur.execute("SELECT COUNT(*) FROM articles")
-            total_articles = cur.fetchone()[0]
-        
-            # Récupérer les articles pour la page courante
-            cur, column_names = execute_with_names("""
-                SELECT id, title, content, image_path, created_at, 
-                       COALESCE(image_path, '') as image_path_clean
+        # Le total ne sert qu'aux liens de pagination : il est gardé en cache, et
+        # recalculé dans la même requête que la page quand le cache est vide
+        total_articles = _articles_count_cache.get("total")
+        count_column = ", (SELECT COUNT(*) FROM articles) AS total_count" if total_articles is None else ""
+        
+        if after is not None:
+            # Page suivante : recherche par clé à partir du dernier article affiché,
+            # le coût ne dépend pas de la profondeur de la page
+            articles, _ = db_execute(conn, f"""
+                SELECT id, title, SUBSTR(content, 1, {ARTICLE_EXCERPT_LENGTH}) AS content,
+                       image_path, created_at{count_column}
                 FROM articles 
-                ORDER BY created_at DESC
-                LIMIT %s OFFSET %s
-            """, (per_page, offset))
-            articles = cur.fetchall()
-            # Convertir les tuples MySQL en objets avec attributs nommés
-            articles = [convert_mysql_result(article, column_names) for article in articles]
+                WHERE created_at < ? OR (created_at = ? AND id < ?)
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?
+            """, (after[0], after[0], after[1], per_page))
         else:
-            cur = conn.cursor()
-            
-            # Compter le nombre total d'articles
-            cur.execute("SELECT COUNT(*) FROM articles")
-            total_articles = cur.fetchone()[0]
-            
-            # Récupérer les articles pour la page courante
-            cur.execute("""
-                SELECT id, title, content, image_path, created_at, 
-                       COALESCE(image_path, '') as image_path_clean
-                FROM articles 
-                ORDER BY created_at DESC
-                LIMIT ? OFFSET ?
-            """, (per_page, offset))
-            articles = cur.fetchall()
+            # Accès direct à un numéro de page : l'OFFSET ne parcourt que les identifiants
+            # (index created_at, id), les colonnes larges ne sont lues que pour la page
+            articles, _ = db_execute(conn, f"""
+                SELECT a.id, a.title, SUBSTR(a.content, 1, {ARTICLE_EXCERPT_LENGTH}) AS content,
+                       a.image_path, a.created_at{count_column}
+                FROM articles a
+                JOIN (
+                    SELECT id FROM articles
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT ? OFFSET ?
+                ) page_ids ON a.id = page_ids.id
+                ORDER BY a.created_at DESC, a.id DESC
+            """, (per_page, (page - 1) * per_page))
+        
+        if total_articles is None:
+            if articles:
+                total_articles = articles[0].total_count
+            else:
+                # Page vide : le total n'est pas porté par les lignes
+                count_rows, _ = db_execute(conn, "SELECT COUNT(*) AS total FROM articles")
+                total_articles = count_rows[0].total
+            _articles_count_cache.set("total", total_articles)
         
         conn.close()
         user = get_current_user(request)
@@ -3999,7 +3805,10 @@ async def articles_list(request: Request) -> HTMLResponse:
                     "has_prev": has_prev,
                     "has_next": has_next,
                     "prev_url": f"/articles?page={page-1}&per_page={per_page}" if has_prev else None,
-                    "next_url": f"/articles?page={page+1}&per_page={per_page}" if has_next else None,
+                    "next_url": (
+                        f"/articles?page={page+1}&per_page={per_page}"
+                        f"&cursor={encode_article_cursor(articles[-1].created_at, articles[-1].id)}"
+                    ) if has_next and articles else None,
                     "links": pagination_links
                 },
             },
@@ -4020,6 +3829,15 @@ async def articles_list(request: Request) -> HTMLResponse:
         )
 
 
+# Requêtes de la page de détail d'un article, gardées constantes d'une requête à l'autre
+SQL_ARTICLE_BY_ID = "SELECT id, title, content, image_path, created_at FROM articles WHERE id = ?"
+# La barre latérale n'affiche que le titre et la date des articles récents
+SQL_RECENT_ARTICLES = (
+    "SELECT id, title, created_at FROM articles WHERE id != ? "
+    "ORDER BY created_at DESC, id DESC LIMIT 5"
+)
+
+
 @app.get("/articles/{article_id}", response_class=HTMLResponse)
 async def article_detail(request: Request, article_id: int) -> HTMLResponse:
     """Affiche le détail d'un article de presse.
@@ -4033,20 +3851,8 @@ async def article_detail(request: Request, article_id: int) -> HTMLResponse:
     """
     try:
         conn = get_db_connection()
-        
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            from database import get_mysql_cursor_with_names, convert_mysql_result
-            execute_with_names = get_mysql_cursor_with_names(conn)
-            cur, column_names = execute_with_names("SELECT id, title, content, image_path, created_at FROM articles WHERE id = %s", (article_id,))
-            article = cur.fetchone()
-            # Convertir le tuple MySQL en objet avec attributs nommés
-            if article:
-                article = convert_mysql_result(article, column_names)
-        else:
-            cur = conn.cursor()
-            cur.execute("SELECT id, title, content, image_path, created_at FROM articles WHERE id = ?", (article_id,))
-            article = cur.fetchone()
+        rows, _ = db_execute(conn, SQL_ARTICLE_BY_ID, (article_id,))
+        article = rows[0] if rows else None
         
         if article is None:
             conn.close()
@@ -4058,23 +3864,7 @@ async def article_detail(request: Request, article_id: int) -> HTMLResponse:
         article_url = str(request.url)
             
         # Récupérer les articles récents pour la sidebar (avant de fermer la connexion)
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            from database import get_mysql_cursor_with_names, convert_mysql_result
-            execute_with_names = get_mysql_cursor_with_names(conn)
-            cur, column_names = execute_with_names(
-                "SELECT id, title, content, image_path, created_at FROM articles WHERE id != %s ORDER BY created_at DESC LIMIT 5", 
-                (article_id,)
-            )
-            recent_articles = cur.fetchall()
-            # Convertir les tuples MySQL en objets avec attributs nommés
-            recent_articles = [convert_mysql_result(article, column_names) for article in recent_articles]
-        else:
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT id, title, content, image_path, created_at FROM articles WHERE id != ? ORDER BY created_at DESC LIMIT 5", 
-                (article_id,)
-            )
-            recent_articles = cur.fetchall()
+        recent_articles, _ = db_execute(conn, SQL_RECENT_ARTICLES, (article_id,))
         
         # Fermer la connexion après avoir récupéré tous les données
         conn.close()
@@ -4104,6 +3894,10 @@ async def article_detail(request: Request, article_id: int) -> HTMLResponse:
         )
 
 
+# Nombre d'articles affichés par page dans l'administration
+ADMIN_ARTICLES_PAGE_SIZE = 50
+
+
 @app.get("/admin/articles", response_class=HTMLResponse)
 async def admin_articles(request: Request) -> HTMLResponse:
     """Interface d'administration des articles.
@@ -4116,27 +3910,36 @@ async def admin_articles(request: Request) -> HTMLResponse:
     if not user:
         return RedirectResponse(url="/connexion", status_code=303)
     check_admin(user)
+    after = decode_article_cursor(request.query_params.get("cursor"))
     conn = get_db_connection()
-    
-    # Vérifier si c'est une connexion MySQL
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        from database import get_mysql_cursor_with_names, convert_mysql_result
-        execute_with_names = get_mysql_cursor_with_names(conn)
-        cur, column_names = execute_with_names("SELECT id, title, created_at FROM articles ORDER BY created_at DESC")
-        articles = cur.fetchall()
-        # Convertir les tuples MySQL en objets avec attributs nommés
-        articles = [convert_mysql_result(article, column_names) for article in articles]
+    # Une ligne de plus que la page permet de savoir s'il reste des articles plus anciens
+    if after is not None:
+        articles, _ = db_execute(conn, """
+            SELECT id, title, created_at FROM articles
+            WHERE created_at < ? OR (created_at = ? AND id < ?)
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        """, (after[0], after[0], after[1], ADMIN_ARTICLES_PAGE_SIZE + 1))
     else:
-        cur = conn.cursor()
-        cur.execute("SELECT id, title, created_at FROM articles ORDER BY datetime(created_at) DESC")
-        articles = cur.fetchall()
+        articles, _ = db_execute(conn, """
+            SELECT id, title, created_at FROM articles
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        """, (ADMIN_ARTICLES_PAGE_SIZE + 1,))
     conn.close()
+    next_url = None
+    if len(articles) > ADMIN_ARTICLES_PAGE_SIZE:
+        articles = articles[:ADMIN_ARTICLES_PAGE_SIZE]
+        last = articles[-1]
+        next_url = f"/admin/articles?cursor={encode_article_cursor(last.created_at, last.id)}"
     return templates.TemplateResponse(
         "admin_articles.html",
         {
             "request": request,
             "user": user,
             "articles": articles,
+            "next_url": next_url,
+            "is_first_page": after is None,
         },
     )
 
@@ -4173,53 +3976,8 @@ async def admin_new_article(request: Request) -> HTMLResponse:
         return RedirectResponse(url="/connexion", status_code=303)
     check_admin(user)
     
-    # Déterminer le type de contenu
-    content_type = request.headers.get("content-type", "")
     errors: List[str] = []
-    title = ""
-    content_text = ""
-    image_path: str = ""
-    
-    # Lire le body une seule fois
-    body = await request.body()
-    
-    if "multipart/form-data" in content_type:
-        # Analyse du corps multipart
-        form = parse_multipart_form(body, content_type)
-        title = str(form.get("title", "")).strip()
-        content_text = str(form.get("content", "")).strip()
-        
-        # Gestion du fichier image s'il existe
-        file_field = form.get("image_file")
-        if file_field and isinstance(file_field, dict):
-            filename = file_field.get("filename")
-            file_content = file_field.get("content", b"")
-            if filename and file_content:
-                # Générer un nom unique pour éviter les collisions
-                ext = os.path.splitext(filename)[1] or ".bin"
-                unique_name = f"{uuid.uuid4().hex}{ext}"
-                
-                # Upload vers HostGator exclusivement
-                try:
-                    result = upload_photo_to_imgbb(file_content, unique_name)
-                    if result.get('success'):
-                        # Utiliser l'URL complète ImgBB pour la base de données
-                        image_path = result.get('url')
-                        print(f"✅ Image uploadée vers ImgBB: {image_path}")
-                    else:
-                        # En cas d'échec, utiliser l'image par défaut ImgBB
-                        image_path = "https://i.ibb.co/8nBCWmhf/test-image-png.png"
-                        print(f"⚠️ Échec upload ImgBB, utilisation image par défaut: {result.get('error')}")
-                except Exception as e:
-                    # En cas d'erreur, utiliser l'image par défaut ImgBB
-                    image_path = "https://i.ibb.co/8nBCWmhf/test-image-png.png"
-                    print(f"❌ Erreur HostGator, utilisation image par défaut: {e}")
-    else:
-        # Analyse du corps form-urlencoded
-        form = urllib.parse.parse_qs(body.decode(), keep_blank_values=True)
-        title = form.get("title", [""])[0].strip()
-        content_text = form.get("content", [""])[0].strip()
-        image_path = form.get("image_url", [""])[0].strip()
+    title, content_text, image_path, is_multipart = await read_article_form(request)
     
     # Vérifications
     if not title:
@@ -4238,30 +3996,15 @@ async def admin_new_article(request: Request) -> HTMLResponse:
                 "title": title,
                 "content": content_text,
                 # Si le formulaire multipart a été utilisé, l'URL n'est pas disponible
-                "image_url": image_path if "multipart/form-data" not in content_type else "",
+                "image_url": image_path if not is_multipart else "",
             },
         )
     
     # Insérer dans la base de données
     conn = get_db_connection()
-    
-    # Vérifier si c'est une connexion MySQL
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur = conn.cursor()
-        now_str = datetime.utcnow().isoformat()
-        cur.execute(
-            "INSERT INTO articles (title, content, image_path, created_at) VALUES (%s, %s, %s, %s)",
-            (title, content_text, image_path, now_str),
-        )
-    else:
-        cur = conn.cursor()
-        now_str = datetime.utcnow().isoformat()
-        cur.execute(
-            "INSERT INTO articles (title, content, image_path, created_at) VALUES (?, ?, ?, ?)",
-            (title, content_text, image_path, now_str),
-        )
-    
+    insert_articles(conn, [(title, content_text, image_path, datetime.utcnow().isoformat())])
     conn.commit()
+    invalidate_article_caches()
     conn.close()
     return RedirectResponse(url="/admin/articles", status_code=303)
 
@@ -4273,37 +4016,25 @@ async def admin_delete_article(request: Request) -> HTMLResponse:
     if not user:
         return RedirectResponse(url="/connexion", status_code=303)
     check_admin(user)
-    raw_body = await request.body()
-    form = urllib.parse.parse_qs(raw_body.decode(), keep_blank_values=True)
+    form = await request.form()
     try:
-        article_id = int(form.get("article_id", ["0"])[0])
+        article_id = int(form.get("article_id") or 0)
     except ValueError:
         return RedirectResponse(url="/admin/articles", status_code=303)
     
     conn = get_db_connection()
     
-    # Récupérer le chemin de l'image avant de supprimer l'article
-    image_path = None
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur = conn.cursor()
-        cur.execute("SELECT image_path FROM articles WHERE id = %s", (article_id,))
-        result = cur.fetchone()
-        if result:
-            image_path = result[0]
-    else:
-        cur = conn.cursor()
-        cur.execute("SELECT image_path FROM articles WHERE id = ?", (article_id,))
-        result = cur.fetchone()
-        if result:
-            image_path = result[0]
-    
-    # Supprimer l'article de la base de données
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur.execute("DELETE FROM articles WHERE id = %s", (article_id,))
+    if getattr(conn, '_supports_returning', False):
+        # Une seule requête supprime l'article et renvoie le chemin de son image
+        rows, _ = db_execute(conn, "DELETE FROM articles WHERE id = ? RETURNING image_path", (article_id,))
     else:
-        cur.execute("DELETE FROM articles WHERE id = ?", (article_id,))
+        # MySQL n'a pas RETURNING : lecture puis suppression dans la même transaction
+        rows, _ = db_execute(conn, "SELECT image_path FROM articles WHERE id = ?", (article_id,))
+        db_execute_write(conn, "DELETE FROM articles WHERE id = ?", (article_id,))
+    image_path = rows[0].image_path if rows else None
     
     conn.commit()
+    invalidate_article_caches()
     conn.close()
     
     # Supprimer le fichier image s'il existe et s'il s'agit d'un upload local
@@ -4323,6 +4054,55 @@ async def admin_delete_article(request: Request) -> HTMLResponse:
     return RedirectResponse(url="/admin/articles", status_code=303)
 
 
+# Extensions des images d'articles stockées localement
+ARTICLE_IMAGE_EXTENSIONS = frozenset({"jpg", "jpeg", "png", "gif", "webp"})
+LOCAL_ARTICLE_IMAGE_PREFIX = "/static/article_images/"
+
+
+def remove_orphaned_article_images() -> int:
+    """Supprime du dossier local les images qu'aucun article ne référence.
+
+    Fonction synchrone (accès disque et base), appelée via asyncio.to_thread.
+
+    Returns:
+        Le nombre d'images supprimées.
+    """
+    images_dir = os.path.join(BASE_DIR, "static", "article_images")
+    if not os.path.isdir(images_dir):
+        return 0
+    
+    # Noms de fichiers des images locales encore utilisées par un article
+    conn = get_db_connection()
+    try:
+        rows, _ = db_execute(
+            conn,
+            "SELECT image_path FROM articles WHERE image_path LIKE ?",
+            (LOCAL_ARTICLE_IMAGE_PREFIX + "%",)
+        )
+    finally:
+        conn.close()
+    referenced = {os.path.basename(row.image_path) for row in rows}
+    
+    # Images présentes sur le disque, moins celles référencées
+    with os.scandir(images_dir) as entries:
+        on_disk = {
+            entry.name: entry.path
+            for entry in entries
+            if entry.is_file(follow_symlinks=False)
+            and entry.name.rpartition(".")[2].lower() in ARTICLE_IMAGE_EXTENSIONS
+        }
+    
+    cleaned_count = 0
+    for filename in on_disk.keys() - referenced:
+        try:
+            os.remove(on_disk[filename])
+            cleaned_count += 1
+            print(f"Image orpheline supprimée : {filename}")
+        except Exception as e:
+            print(f"Erreur lors de la suppression de {filename}: {e}")
+    return cleaned_count
+
+
 @app.post("/admin/articles/nettoyer-images", response_class=HTMLResponse)
 async def admin_cleanup_orphaned_images(request: Request) -> HTMLResponse:
     """Nettoie les images orphelines (images sans article associé)."""
@@ -4331,43 +4111,7 @@ async def admin_cleanup_orphaned_images(request: Request) -> HTMLResponse:
         return RedirectResponse(url="/connexion", status_code=303)
     check_admin(user)
     
-    conn = get_db_connection()
-    
-    # Récupérer tous les chemins d'images utilisés dans la base
-    used_images = set()
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur = conn.cursor()
-        cur.execute("SELECT image_path FROM articles WHERE image_path IS NOT NULL AND image_path != ''")
-        results = cur.fetchall()
-        for result in results:
-            if result[0]:
-                used_images.add(result[0])
-    else:
-        cur = conn.cursor()
-        cur.execute("SELECT image_path FROM articles WHERE image_path IS NOT NULL AND image_path != ''")
-        results = cur.fetchall()
-        for result in results:
-            if result[0]:
-                used_images.add(result[0])
-    
-    conn.close()
-    
-    # Parcourir le dossier des images et supprimer les orphelines
-    images_dir = os.path.join(BASE_DIR, "static", "article_images")
-    cleaned_count = 0
-    
-    if os.path.exists(images_dir):
-        for filename in os.listdir(images_dir):
-            if filename.endswith(('.jpg', '.jpeg', '.png', '.gif', '.webp')):
-                image_path = f"/static/article_images/{filename}"
-                if image_path not in used_images:
-                    try:
-                        file_path = os.path.join(images_dir, filename)
-                        os.remove(file_path)
-                        cleaned_count += 1
-                        print(f"Image orpheline supprimée : {filename}")
-                    except Exception as e:
-                        print(f"Erreur lors de la suppression de {filename}: {e}")
+    cleaned_count = await asyncio.to_thread(remove_orphaned_article_images)
     
     # Rediriger avec un message de succès
     return RedirectResponse(
@@ -4385,21 +4129,9 @@ async def admin_edit_article_form(request: Request, article_id: int) -> HTMLResp
     check_admin(user)
     
     conn = get_db_connection()
-    
-    # Vérifier si c'est une connexion MySQL
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        from database import get_mysql_cursor_with_names, convert_mysql_result
-        execute_with_names = get_mysql_cursor_with_names(conn)
-        cur, column_names = execute_with_names("SELECT id, title, content, image_path, created_at FROM articles WHERE id = %s", (article_id,))
-        article = cur.fetchone()
-        # Convertir le tuple MySQL en objet avec attributs nommés
-        article = convert_mysql_result(article, column_names) if article else None
-    else:
-        cur = conn.cursor()
-        cur.execute("SELECT id, title, content, image_path, created_at FROM articles WHERE id = ?", (article_id,))
-        article = cur.fetchone()
-    
+    rows, _ = db_execute(conn, SQL_ARTICLE_BY_ID, (article_id,))
     conn.close()
+    article = rows[0] if rows else None
     
     if not article:
         return templates.TemplateResponse(
@@ -4421,52 +4153,8 @@ async def admin_edit_article(request: Request, article_id: int) -> HTMLResponse:
         return RedirectResponse(url="/connexion", status_code=303)
     check_admin(user)
     
-    # Déterminer le type de contenu
-    content_type = request.headers.get("content-type", "")
     errors: List[str] = []
-    title = ""
-    content_text = ""
-    image_path: str = ""
-    
-    if "multipart/form-data" in content_type:
-        # Analyse du corps multipart
-        body = await request.body()
-        form = parse_multipart_form(body, content_type)
-        title = str(form.get("title", "")).strip()
-        content_text = str(form.get("content", "")).strip()
-        # Gestion du fichier image s'il existe
-        file_field = form.get("image_file")
-        if file_field and isinstance(file_field, dict):
-            filename = file_field.get("filename")
-            file_content = file_field.get("content", b"")
-            if filename and file_content:
-                # Créer un dossier pour les images si nécessaire
-                images_dir = os.path.join(BASE_DIR, "static", "article_images")
-                os.makedirs(images_dir, exist_ok=True)
-                # Générer un nom unique pour éviter les collisions
-                ext = os.path.splitext(filename)[1] or ".bin"
-                unique_name = f"{uuid.uuid4().hex}{ext}"
-                # Upload vers ImgBB exclusivement
-                try:
-                    result = upload_photo_to_imgbb(file_content, unique_name)
-                    if result.get('success'):
-                        image_path = result.get('url')
-                        print(f"✅ Image uploadée vers ImgBB: {image_path}")
-                    else:
-                        # En cas d'échec, utiliser l'image par défaut ImgBB
-                        image_path = "https://i.ibb.co/8nBCWmhf/test-image-png.png"
-                        print(f"⚠️ Échec upload ImgBB, utilisation image par défaut: {result.get('error')}")
-                except Exception as e:
-                    # En cas d'erreur, utiliser l'image par défaut ImgBB
-                    image_path = "https://i.ibb.co/8nBCWmhf/test-image-png.png"
-                    print(f"❌ Erreur HostGator, utilisation image par défaut: {e}")
-    else:
-        # Formulaire standard urlencoded (image_url fourni par l'utilisateur)
-        raw_body = await request.body()
-        form = urllib.parse.parse_qs(raw_body.decode(), keep_blank_values=True)
-        title = form.get("title", [""])[0].strip()
-        content_text = form.get("content", [""])[0].strip()
-        image_path = form.get("image_url", [""])[0].strip()
+    title, content_text, image_path, _ = await read_article_form(request)
     
     # Vérifications
     if not title:
@@ -4474,43 +4162,29 @@ async def admin_edit_article(request: Request, article_id: int) -> HTMLResponse:
     if not content_text:
         errors.append("Le contenu est obligatoire.")
     
-    # Si erreurs, récupérer l'article et renvoyer le formulaire avec les champs saisis
+    # Si erreurs, renvoyer le formulaire avec les champs saisis ; seule l'image
+    # actuelle est relue (le formulaire multipart ne la renvoie pas), ce qui
+    # vérifie aussi que l'article existe
     if errors:
         conn = get_db_connection()
-        
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            from database import get_mysql_cursor_with_names, convert_mysql_result
-            execute_with_names = get_mysql_cursor_with_names(conn)
-            cur, column_names = execute_with_names("SELECT id, title, content, image_path, created_at FROM articles WHERE id = %s", (article_id,))
-            article = cur.fetchone()
-            # Convertir le tuple MySQL en objet avec attributs nommés
-            article = convert_mysql_result(article, column_names) if article else None
-        else:
-            cur = conn.cursor()
-            cur.execute("SELECT id, title, content, image_path, created_at FROM articles WHERE id = ?", (article_id,))
-            article = cur.fetchone()
-        
+        rows, _ = db_execute(conn, "SELECT image_path FROM articles WHERE id = ?", (article_id,))
         conn.close()
-        
-        if not article:
+        if not rows:
             return templates.TemplateResponse(
                 "error.html",
                 {"request": request, "message": "Article introuvable."},
             )
-        
-        # Mettre à jour les valeurs avec celles saisies par l'utilisateur
-        article.title = title
-        article.content = content_text
-        if image_path:
-            article.image_path = image_path
-        
         return templates.TemplateResponse(
             "admin_edit_article.html",
             {
                 "request": request,
                 "user": user,
-                "article": article,
+                "article": {
+                    "id": article_id,
+                    "title": title,
+                    "content": content_text,
+                    "image_path": image_path or rows[0].image_path or "",
+                },
                 "errors": errors,
             },
         )
@@ -4518,35 +4192,20 @@ async def admin_edit_article(request: Request, article_id: int) -> HTMLResponse:
     # Mettre à jour dans la base de données
     conn = get_db_connection()
     
-    # Vérifier si c'est une connexion MySQL
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        cur = conn.cursor()
-        if image_path:
-            # Si une nouvelle image est fournie, mettre à jour l'image aussi
-            cur.execute(
-                "UPDATE articles SET title = %s, content = %s, image_path = %s WHERE id = %s",
-                (title, content_text, image_path, article_id),
-            )
-        else:
-            # Sinon, garder l'image existante
-            cur.execute(
-                "UPDATE articles SET title = %s, content = %s WHERE id = %s",
-                (title, content_text, article_id),
-            )
+    if image_path:
+        # Si une nouvelle image est fournie, mettre à jour l'image aussi
+        db_execute_write(
+            conn,
+            "UPDATE articles SET title = ?, content = ?, image_path = ? WHERE id = ?",
+            (title, content_text, image_path, article_id),
+        )
     else:
-        cur = conn.cursor()
-        if image_path:
-            # Si une nouvelle image est fournie, mettre à jour l'image aussi
-            cur.execute(
-                "UPDATE articles SET title = ?, content = ?, image_path = ? WHERE id = ?",
-                (title, content_text, image_path, article_id),
-            )
-        else:
-            # Sinon, garder l'image existante
-            cur.execute(
-                "UPDATE articles SET title = ?, content = ? WHERE id = ?",
-                (title, content_text, article_id),
-            )
+        # Sinon, garder l'image existante
+        db_execute_write(
+            conn,
+            "UPDATE articles SET title = ?, content = ? WHERE id = ?",
+            (title, content_text, article_id),
+        )
     
     conn.commit()
     conn.close()
@@ -4564,17 +4223,17 @@ async def test_espace_simple(request: Request) -> JSONResponse:
         # Test 1: Récupération du cookie
         token = request.cookies.get("session_token")
         if not token:
-            return JSONResponse({"error": "Aucun token de session trouvé"})
+            return FastJSONResponse({"error": "Aucun token de session trouvé"})
         
         # Test 2: Parsing du token
         user_id = parse_session_token(token)
         if not user_id:
-            return JSONResponse({"error": "Token de session invalide", "token": token})
+            return FastJSONResponse({"error": "Token de session invalide", "token": token})
         
         # Test 3: Récupération de l'utilisateur
         user = get_current_user(request)
         if not user:
-            return JSONResponse({"error": "get_current_user retourne None", "user_id": user_id})
+            return FastJSONResponse({"error": "get_current_user retourne None", "user_id": user_id})
         
         # Test 4: Vérification des attributs
         user_attrs = {}
@@ -4600,9 +4259,10 @@ async def test_espace_simple(request: Request) -> JSONResponse:
         
         # Test 5: Vérification du type d'objet
         user_type = type(user).__name__
-        user_dir = dir(user)
+        # La liste complète des attributs (plusieurs Ko) n'est renvoyée qu'en mode développement
+        user_dir = dir(user) if DEBUG else None
         
-        return JSONResponse({
+        return FastJSONResponse({
             "success": True,
             "token": token,
             "user_id": user_id,
@@ -4616,53 +4276,88 @@ async def test_espace_simple(request: Request) -> JSONResponse:
         
     except Exception as e:
         import traceback
-        return JSONResponse({
+        return FastJSONResponse({
             "error": str(e),
             "traceback": traceback.format_exc()
         })
 
+def count_user_reservations(user_id: int) -> Tuple[int, bool]:
+    """Compte les réservations d'un membre et indique si la base est MySQL.
+
+    Fonction synchrone, appelée via asyncio.to_thread.
+    """
+    conn = get_db_connection()
+    try:
+        rows, _ = db_execute(conn, "SELECT COUNT(*) AS total FROM reservations WHERE user_id = ?", (user_id,))
+        return rows[0].total, getattr(conn, '_is_mysql', False)
+    finally:
+        conn.close()
+
+
 @app.get("/test-db-espace")
 async def test_db_espace(request: Request) -> JSONResponse:
     """Test de la base de données pour /espace."""
     try:
         user = get_current_user(request)
         if not user:
-            return JSONResponse({"error": "Utilisateur non connecté"})
+            return FastJSONResponse({"error": "Utilisateur non connecté"})
         
-        conn = get_db_connection()
+        count, is_mysql = await asyncio.to_thread(count_user_reservations, user.id)
         
-        # Test simple de la base
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            cur = conn.cursor()
-            cur.execute("SELECT COUNT(*) FROM reservations WHERE user_id = %s", (user.id,))
-            count = cur.fetchone()[0]
-            conn.close()
-            
-            return JSONResponse({
-                "success": True,
-                "database_type": "MySQL",
-                "reservations_count": count,
-                "user_id": user.id
-            })
-        else:
-            cur = conn.cursor()
-            cur.execute("SELECT COUNT(*) FROM reservations WHERE user_id = ?", (user.id,))
-            count = cur.fetchone()[0]
-            conn.close()
-            
-            return JSONResponse({
-                "success": True,
-                "database_type": "SQLite/PostgreSQL",
-                "reservations_count": count,
-                "user_id": user.id
-            })
+        return FastJSONResponse({
+            "success": True,
+            "database_type": "MySQL" if is_mysql else "SQLite/PostgreSQL",
+            "reservations_count": count,
+            "user_id": user.id
+        })
             
     except Exception as e:
-        return JSONResponse({
+        return FastJSONResponse({
             "error": str(e),
             "traceback": str(e.__traceback__)
         })
 
+def fetch_monthly_reservation_counts(user_id: int) -> Optional[list]:
+    """Retourne le nombre de réservations d'un membre par mois (month, count).
+
+    Fonction synchrone, appelée via asyncio.to_thread. Retourne None en cas
+    d'erreur SQL, pour que la page reste affichable.
+    """
+    conn = get_db_connection()
+    try:
+        # Regrouper par année-mois et compter
+        rows, _ = db_execute(
+            conn,
+            "SELECT substr(date, 1, 7) AS month, COUNT(*) AS count FROM reservations WHERE user_id = ? GROUP BY month ORDER BY month",
+            (user_id,),
+        )
+        return rows
+    except Exception as e:
+        print(f"❌ Erreur dans la requête SQL de /espace: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+def build_dashboard_stats(rows: list) -> Dict[str, Any]:
+    """Prépare les données de /espace (listes et JSON pour Chart.js, totaux)."""
+    # Transformer les résultats en listes pour Chart.js
+    months: List[str] = [row.month for row in rows]
+    counts: List[int] = [row.count for row in rows]
+    total_reservations = sum(counts)
+    return {
+        "months": months,
+        "counts": counts,
+        # Versions JSON des listes, sérialisées une fois par entrée de cache
+        "months_js": to_json(months),
+        "counts_js": to_json(counts),
+        # Paires pour itération dans le template (mois, count)
+        "data_pairs": list(zip(months, counts)),
+        "total_reservations": total_reservations,
+        "total_hours": total_reservations,  # Chaque réservation = 1 heure
+    }
+
+
 @app.get("/espace", response_class=HTMLResponse)
 async def user_dashboard(request: Request) -> HTMLResponse:
     """Page personnelle affichant les statistiques de réservation par mois.
@@ -4679,108 +4374,81 @@ async def user_dashboard(request: Request) -> HTMLResponse:
             "not_validated.html",
             {"request": request, "message": "Votre inscription doit être validée pour accéder à cet espace."},
         )
-    conn = get_db_connection()
-    
-    # Vérifier si c'est une connexion MySQL
-    if hasattr(conn, '_is_mysql') and conn._is_mysql:
-        from database import get_mysql_cursor_with_names, convert_mysql_result
-        execute_with_names = get_mysql_cursor_with_names(conn)
-        try:
-            # Regrouper par année-mois et compter
-            cur, column_names = execute_with_names(
-                "SELECT substr(date, 1, 7) AS month, COUNT(*) AS count FROM reservations WHERE user_id = %s GROUP BY month ORDER BY month",
-                (user.id,),
-            )
-            rows = cur.fetchall()
-            # Convertir les tuples MySQL en objets avec attributs nommés
-            rows = [convert_mysql_result(row, column_names) for row in rows]
-        except Exception as e:
-            print(f"❌ Erreur dans la requête SQL de /espace: {e}")
-            # En cas d'erreur, retourner des données vides
-            rows = []
-        finally:
-            conn.close()
-    else:
-        cur = conn.cursor()
-        try:
-            # Regrouper par année-mois et compter
-            cur.execute(
-                "SELECT substr(date, 1, 7) AS month, COUNT(*) AS count FROM reservations WHERE user_id = ? GROUP BY month ORDER BY month",
-                (user.id,),
-            )
-            rows = cur.fetchall()
-        except Exception as e:
-            print(f"❌ Erreur dans la requête SQL de /espace: {e}")
-            # En cas d'erreur, retourner des données vides
-            rows = []
-        finally:
-            conn.close()
-    # Transformer les résultats en listes pour Chart.js
-    months: List[str] = []
-    counts: List[int] = []
-    try:
-        for row in rows:
-            months.append(row.month)
-            counts.append(row.count)
-        # Préparer les versions JSON des listes pour Chart.js
-        months_js = json.dumps(months)
-        counts_js = json.dumps(counts)
-        # Préparer les paires pour itération dans le template (mois, count)
-        data_pairs = list(zip(months, counts))
-        
-        # Calculer les statistiques supplémentaires
-        total_reservations = sum(counts)
-        total_hours = total_reservations  # Chaque réservation = 1 heure
-    except Exception as e:
-        print(f"❌ Erreur dans la transformation des données de /espace: {e}")
-        # En cas d'erreur, utiliser des listes vides
-        months = []
-        counts = []
-        months_js = json.dumps([])
-        counts_js = json.dumps([])
-        data_pairs = []
-        total_reservations = 0
-        total_hours = 0
+    stats = _dashboard_cache.get(user.id)
+    if stats is None:
+        rows = await asyncio.to_thread(fetch_monthly_reservation_counts, user.id)
+        if rows is None:
+            # Erreur SQL : page vide, sans la garder en cache
+            stats = build_dashboard_stats([])
+        else:
+            stats = build_dashboard_stats(rows)
+            _dashboard_cache.set(user.id, stats)
     
     return templates.TemplateResponse(
         "user_dashboard.html",
-        {
-            "request": request,
-            "user": user,
-            "months": months,
-            "counts": counts,
-            "months_js": months_js,
-            "counts_js": counts_js,
-            "data_pairs": data_pairs,
-            "total_reservations": total_reservations,
-            "total_hours": total_hours,
-        },
+        {"request": request, "user": user, **stats},
     )
 
 # -----------------------------------------------------------------------------
 #  Endpoint de santé pour Render
 # -----------------------------------------------------------------------------
 
-@app.get("/health")
-async def health_check():
-    """Point de terminaison de santé pour vérifier l'état de l'application et de la base de données."""
+# Comptages des tables principales (/health, diagnostics), en un seul aller-retour
+SQL_TABLE_COUNTS = (
+    "SELECT (SELECT COUNT(*) FROM users) AS users_count, "
+    "(SELECT COUNT(*) FROM reservations) AS reservations_count, "
+    "(SELECT COUNT(*) FROM articles) AS articles_count"
+)
+
+
+def count_table_rows() -> Tuple[int, int, int]:
+    """Compte les utilisateurs, réservations et articles (/health, état des sauvegardes).
+
+    Fonction synchrone, appelée via asyncio.to_thread.
+    """
+    conn = get_db_connection()
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # Vérifier les tables
-        cur.execute("SELECT COUNT(*) FROM users")
-        users_count = cur.fetchone()[0]
-        
-        cur.execute("SELECT COUNT(*) FROM reservations")
-        reservations_count = cur.fetchone()[0]
-        
-        cur.execute("SELECT COUNT(*) FROM articles")
-        articles_count = cur.fetchone()[0]
-        
+        # Les trois comptages en une seule requête
+        rows, _ = db_execute(conn, SQL_TABLE_COUNTS)
+    finally:
         conn.close()
+    counts = rows[0]
+    return counts.users_count, counts.reservations_count, counts.articles_count
+
+
+# Les sondes de la plateforme appellent /health toutes les quelques secondes :
+# les comptages sont réutilisés pendant 5 secondes
+_health_cache = TTLCache(maxsize=1, ttl=5)
+_health_lock = asyncio.Lock()
+HEALTH_CACHE_CONTROL = "public, max-age=5, stale-while-revalidate=30"
+
+
+@app.get("/health")
+async def health_check(request: Request):
+    """Point de terminaison de santé pour vérifier l'état de l'application et de la base de données.
+
+    La réponse peut être gardée 5 secondes par un proxy ; une sonde qui renvoie
+    l'ETag reçu obtient un 304 tant que les comptages n'ont pas changé.
+    """
+    try:
+        counts = _health_cache.get("counts")
+        if counts is None:
+            # Une seule sonde interroge la base quand l'entrée expire
+            async with _health_lock:
+                counts = _health_cache.get("counts")
+                if counts is None:
+                    counts = await asyncio.to_thread(count_table_rows)
+                    _health_cache.set("counts", counts)
+        users_count, reservations_count, articles_count = counts
+        
+        headers = {
+            "Cache-Control": HEALTH_CACHE_CONTROL,
+            "ETag": f'W/"{users_count}-{reservations_count}-{articles_count}"',
+        }
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=304, headers=headers)
         
-        return {
+        return FastJSONResponse({
             "status": "healthy",
             "database": {
                 "users": users_count,
@@ -4788,7 +4456,7 @@ async def health_check():
                 "articles": articles_count
             },
             "timestamp": datetime.now().isoformat()
-        }
+        }, headers=headers)
         
     except Exception as e:
         return {
@@ -4798,6 +4466,36 @@ async def health_check():
         }
 
 
+# Articles de test créés par /init-articles : (titre, contenu, ancienneté en jours)
+TEST_ARTICLES = (
+    (
+        "Ouverture de la saison 2025",
+        "Le Club Municipal de Tennis Chihia est ravi d'annoncer l'ouverture de la saison 2025. Cette année promet d'être exceptionnelle avec de nouveaux équipements et des programmes d'entraînement améliorés pour tous les niveaux.",
+        2,
+    ),
+    (
+        "Nouveau programme pour les jeunes",
+        "Nous lançons un nouveau programme spécialement conçu pour les jeunes de 8 à 16 ans. Ce programme combine technique, tactique et plaisir pour développer la passion du tennis chez nos futurs champions.",
+        5,
+    ),
+    (
+        "Tournoi interne du mois",
+        "Le tournoi interne du mois de janvier aura lieu le week-end prochain. Tous les membres sont invités à participer. Inscriptions ouvertes jusqu'à vendredi soir.",
+        8,
+    ),
+    (
+        "Maintenance des courts",
+        "Nos courts de tennis ont été entièrement rénovés pendant les vacances. Nouvelle surface, filets neufs et éclairage amélioré pour une expérience de jeu optimale.",
+        12,
+    ),
+    (
+        "Bienvenue aux nouveaux membres",
+        "Nous souhaitons la bienvenue à tous nos nouveaux membres qui ont rejoint le club ce mois-ci. N'hésitez pas à participer aux activités et à vous intégrer dans notre communauté tennis.",
+        15,
+    ),
+)
+
+
 @app.get("/init-articles")
 async def init_articles_endpoint():
     """Point de terminaison pour créer des articles de test (débogage uniquement)."""
@@ -4815,56 +4513,21 @@ async def init_articles_endpoint():
                 "message": f"Il y a déjà {existing_articles} article(s) dans la base de données. Utilisez /clear-articles pour les supprimer d'abord."
             }
         
-        # Articles de test avec des dates récentes
-        test_articles = [
-            {
-                "title": "Ouverture de la saison 2025",
-                "content": "Le Club Municipal de Tennis Chihia est ravi d'annoncer l'ouverture de la saison 2025. Cette année promet d'être exceptionnelle avec de nouveaux équipements et des programmes d'entraînement améliorés pour tous les niveaux.",
-                "created_at": (datetime.now() - timedelta(days=2)).isoformat()
-            },
-            {
-                "title": "Nouveau programme pour les jeunes",
-                "content": "Nous lançons un nouveau programme spécialement conçu pour les jeunes de 8 à 16 ans. Ce programme combine technique, tactique et plaisir pour développer la passion du tennis chez nos futurs champions.",
-                "created_at": (datetime.now() - timedelta(days=5)).isoformat()
-            },
-            {
-                "title": "Tournoi interne du mois",
-                "content": "Le tournoi interne du mois de janvier aura lieu le week-end prochain. Tous les membres sont invités à participer. Inscriptions ouvertes jusqu'à vendredi soir.",
-                "created_at": (datetime.now() - timedelta(days=8)).isoformat()
-            },
-            {
-                "title": "Maintenance des courts",
-                "content": "Nos courts de tennis ont été entièrement rénovés pendant les vacances. Nouvelle surface, filets neufs et éclairage amélioré pour une expérience de jeu optimale.",
-                "created_at": (datetime.now() - timedelta(days=12)).isoformat()
-            },
-            {
-                "title": "Bienvenue aux nouveaux membres",
-                "content": "Nous souhaitons la bienvenue à tous nos nouveaux membres qui ont rejoint le club ce mois-ci. N'hésitez pas à participer aux activités et à vous intégrer dans notre communauté tennis.",
-                "created_at": (datetime.now() - timedelta(days=15)).isoformat()
-            }
-        ]
-        
-        # Insérer les articles
-        for article in test_articles:
-            # Vérifier si c'est une connexion MySQL
-            if hasattr(conn, '_is_mysql') and conn._is_mysql:
-                cur.execute("""
-                    INSERT INTO articles (title, content, created_at)
-                    VALUES (%s, %s, %s)
-                """, (article["title"], article["content"], article["created_at"]))
-            else:
-                cur.execute("""
-                    INSERT INTO articles (title, content, created_at)
-                    VALUES (?, ?, ?)
-                """, (article["title"], article["content"], article["created_at"]))
+        # Articles de test, datés de quelques jours avant aujourd'hui
+        now = datetime.now()
+        insert_articles(conn, [
+            (title, content, None, (now - timedelta(days=days_ago)).isoformat())
+            for title, content, days_ago in TEST_ARTICLES
+        ])
         
         conn.commit()
+        invalidate_article_caches()
         conn.close()
         
         return {
             "status": "success", 
-            "message": f"{len(test_articles)} articles créés",
-            "articles": [article["title"] for article in test_articles]
+            "message": f"{len(TEST_ARTICLES)} articles créés",
+            "articles": [title for title, _, _ in TEST_ARTICLES]
         }
         
     except Exception as e:
@@ -4874,7 +4537,6 @@ async def init_articles_endpoint():
 async def init_database_endpoint():
     """Point de terminaison pour initialiser manuellement la base de données."""
     try:
-        from database import init_db
         
         print("🔄 Initialisation manuelle de la base de données...")
         init_db()
@@ -4898,36 +4560,29 @@ if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
 
-@app.get("/diagnostic-db")
-async def diagnostic_db():
-    """Point de terminaison de diagnostic pour vérifier l'état de la base de données."""
+def collect_database_diagnostics() -> Dict[str, Any]:
+    """Vérifie les tables et l'utilisateur admin pour /diagnostic-db.
+
+    Fonction synchrone, appelée via asyncio.to_thread.
+    """
     try:
         conn = get_db_connection()
         cur = conn.cursor()
         
-        # Vérifier si les tables existent
+        # Vérifier si les tables existent : une seule requête quand tout va bien
         tables_info = {}
-        
-        try:
-            cur.execute("SELECT COUNT(*) FROM users")
-            users_count = cur.fetchone()[0]
-            tables_info["users"] = {"exists": True, "count": users_count}
-        except Exception as e:
-            tables_info["users"] = {"exists": False, "error": str(e)}
-        
-        try:
-            cur.execute("SELECT COUNT(*) FROM reservations")
-            reservations_count = cur.fetchone()[0]
-            tables_info["reservations"] = {"exists": True, "count": reservations_count}
-        except Exception as e:
-            tables_info["reservations"] = {"exists": False, "error": str(e)}
-        
         try:
-            cur.execute("SELECT COUNT(*) FROM articles")
-            articles_count = cur.fetchone()[0]
-            tables_info["articles"] = {"exists": True, "count": articles_count}
-        except Exception as e:
-            tables_info["articles"] = {"exists": False, "error": str(e)}
+            cur.execute(SQL_TABLE_COUNTS)
+            for table, count in zip(("users", "reservations", "articles"), tuple(cur.fetchone())):
+                tables_info[table] = {"exists": True, "count": count}
+        except Exception:
+            # Une table manque : la chercher table par table
+            for table in ("users", "reservations", "articles"):
+                try:
+                    cur.execute(f"SELECT COUNT(*) FROM {table}")
+                    tables_info[table] = {"exists": True, "count": cur.fetchone()[0]}
+                except Exception as e:
+                    tables_info[table] = {"exists": False, "error": str(e)}
         
         # Vérifier l'utilisateur admin
         admin_info = {}
@@ -4963,6 +4618,11 @@ async def diagnostic_db():
             "timestamp": datetime.now().isoformat()
         }
 
+@app.get("/diagnostic-db")
+async def diagnostic_db():
+    """Point de terminaison de diagnostic pour vérifier l'état de la base de données."""
+    return await asyncio.to_thread(collect_database_diagnostics)
+
 @app.get("/debug-auth")
 async def debug_auth(request: Request):
     """Point de terminaison de débogage pour vérifier l'état de l'authentification."""
@@ -5000,7 +4660,6 @@ async def fix_admin_endpoint():
     """Point de terminaison pour créer/corriger l'utilisateur admin UNIQUEMENT si nécessaire."""
     try:
         # D'abord, initialiser la base de données si nécessaire
-        from database import init_db
         init_db()
         
         conn = get_db_connection()
@@ -5024,7 +4683,7 @@ async def fix_admin_endpoint():
             
             # Mettre à jour le mot de passe
             admin_password = "admin"
-            admin_password_hash = hash_password(admin_password)
+            admin_password_hash = await asyncio.to_thread(hash_password, admin_password)
             
             if admin_user[2] != admin_password_hash:  # password_hash est à l'index 2
                 cur.execute("UPDATE users SET password_hash = %s WHERE username = 'admin'", (admin_password_hash,))
@@ -5053,7 +4712,7 @@ async def fix_admin_endpoint():
         else:
             # Créer l'utilisateur admin
             admin_password = "admin"
-            admin_password_hash = hash_password(admin_password)
+            admin_password_hash = await asyncio.to_thread(hash_password, admin_password)
             
             # Vérifier si c'est une connexion MySQL
             if hasattr(conn, '_is_mysql') and conn._is_mysql:
@@ -5438,7 +5097,6 @@ async def setup_imgbb_endpoint():
 async def test_db_connection_endpoint():
     """Test de la connexion à la base de données"""
     try:
-        from database import get_db_connection
         import os
         
         # Test de la connexion
@@ -5486,53 +5144,24 @@ async def test_db_connection_endpoint():
 async def test_homepage_data_endpoint():
     """Test des données de la page d'accueil"""
     try:
-        from database import get_db_connection
         
         # Récupérer les données comme dans la route home
         conn = get_db_connection()
-        
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            from database import get_mysql_cursor_with_names, convert_mysql_result
-            execute_with_names = get_mysql_cursor_with_names(conn)
-            cur, column_names = execute_with_names(
-                "SELECT id, title, content, image_path, created_at FROM articles ORDER BY created_at DESC LIMIT 3"
-            )
-            latest_articles = cur.fetchall()
-            # Convertir les tuples MySQL en objets avec attributs nommés
-            latest_articles = [convert_mysql_result(article, column_names) for article in latest_articles]
-        else:
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT id, title, content, image_path, created_at FROM articles ORDER BY created_at DESC LIMIT 3"
-            )
-            latest_articles = cur.fetchall()
-        
+        latest_articles, _ = db_execute(conn, SQL_LATEST_ARTICLES)
         conn.close()
         
-        # Analyser les données
-        analyzed_articles = []
-        for article in latest_articles:
-            if hasattr(article, 'id'):
-                # Objet avec attributs
-                analyzed_articles.append({
-                    "id": article.id,
-                    "title": article.title,
-                    "content": article.content,
-                    "image_path": article.image_path,
-                    "created_at": str(article.created_at),
-                    "type": "object_with_attributes"
-                })
-            else:
-                # Tuple
-                analyzed_articles.append({
-                    "id": article[0],
-                    "title": article[1],
-                    "content": article[2],
-                    "image_path": article[3],
-                    "created_at": str(article[4]),
-                    "type": "tuple"
-                })
+        # Analyser les données : db_execute retourne des lignes à attributs sur tous les backends
+        analyzed_articles = [
+            {
+                "id": article.id,
+                "title": article.title,
+                "content": article.content,
+                "image_path": article.image_path,
+                "created_at": str(article.created_at),
+                "type": "object_with_attributes"
+            }
+            for article in latest_articles
+        ]
         
         return {
             "status": "success",
@@ -5663,43 +5292,19 @@ async def test_html_generation_endpoint():
         conn = get_db_connection()
         
         # Récupérer l'article 4
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            from database import get_mysql_cursor_with_names, convert_mysql_result
-            execute_with_names = get_mysql_cursor_with_names(conn)
-            cur, column_names = execute_with_names("SELECT id, title, content, image_path, created_at FROM articles WHERE id = %s", (4,))
-            article = cur.fetchone()
-            if article:
-                article = convert_mysql_result(article, column_names)
-        else:
-            cur = conn.cursor()
-            cur.execute("SELECT id, title, content, image_path, created_at FROM articles WHERE id = ?", (4,))
-            article = cur.fetchone()
-        
+        rows, _ = db_execute(conn, SQL_ARTICLE_BY_ID, (4,))
         conn.close()
+        article = rows[0] if rows else None
         
         if not article:
             return {"error": "Article 4 non trouvé"}
         
         # Tester la fonction ensure_absolute_image_url
-        original_url = article.image_path if hasattr(article, 'image_path') else article[3]
+        original_url = article.image_path
         absolute_url = ensure_absolute_image_url(original_url)
         
         # Vérifier les attributs de l'article
-        article_attrs = {}
-        if hasattr(article, '__dict__'):
-            article_attrs = article.__dict__
-        elif hasattr(article, '_fields'):
-            # Pour les tuples nommés
-            article_attrs = {field: getattr(article, field) for field in article._fields}
-        else:
-            # Pour les tuples simples
-            article_attrs = {
-                'id': article[0] if len(article) > 0 else None,
-                'title': article[1] if len(article) > 1 else None,
-                'content': article[2] if len(article) > 2 else None,
-                'image_path': article[3] if len(article) > 3 else None,
-                'created_at': article[4] if len(article) > 4 else None
-            }
+        article_attrs = article.to_dict()
         
         # Générer le HTML pour voir ce qui est réellement produit
         from fastapi import Request
@@ -5735,63 +5340,72 @@ async def test_html_generation_endpoint():
         img_src_in_html = img_match.group(1) if img_match else "Non trouvé"
         
         return {
-            "article_id": article.id if hasattr(article, 'id') else article[0],
-            "title": article.title if hasattr(article, 'title') else article[1],
+            "article_id": article.id,
+            "title": article.title,
             "original_image_path": original_url,
             "absolute_image_url": absolute_url,
             "function_works": original_url != absolute_url or original_url.startswith('https://'),
             "img_src_in_html": img_src_in_html,
             "html_contains_absolute_url": "https://www.cmtch.online" in img_src_in_html,
             "article_attrs": article_attrs,
-            "image_path_in_template": article.image_path if hasattr(article, 'image_path') else article[3],
-            "image_path_is_truthy": bool(article.image_path if hasattr(article, 'image_path') else article[3])
+            "image_path_in_template": article.image_path,
+            "image_path_is_truthy": bool(article.image_path)
         }
         
     except Exception as e:
         return {"error": str(e)}
 
+# Hébergement des images en production (HostGator) et image par défaut des articles
+PRODUCTION_IMAGE_HOST = "https://www.cmtch.online"
+PRODUCTION_DEFAULT_IMAGE_URL = PRODUCTION_IMAGE_HOST + "/static/article_images/default_article.jpg"
+
+# Image manquante, hors de HostGator, ou image locale autre que l'image par défaut
+SQL_FIX_ARTICLE_IMAGES = """
+    UPDATE articles SET image_path = ?
+    WHERE image_path IS NULL OR image_path = ''
+       OR image_path NOT LIKE ?
+       OR (image_path LIKE ? AND image_path NOT LIKE ?)
+"""
+
+
+def fetch_article_images_debug(limit: int) -> list:
+    """Retourne les images des premiers articles avec leur longueur et leur hébergement.
+
+    Fonction synchrone, appelée via asyncio.to_thread.
+    """
+    conn = get_db_connection()
+    try:
+        # La longueur et le test d'hébergement sont calculés par la base
+        articles, _ = db_execute(conn, """
+            SELECT id, title, image_path,
+                   COALESCE(LENGTH(image_path), 0) AS image_path_length,
+                   COALESCE(image_path LIKE ?, 0) AS is_hostgator_url
+            FROM articles
+            ORDER BY id
+            LIMIT ?
+        """, (PRODUCTION_IMAGE_HOST + "%", limit))
+    finally:
+        conn.close()
+    return articles
+
+
 @app.get("/debug-article-images")
-async def debug_article_images_endpoint():
+async def debug_article_images_endpoint(limit: int = 100):
     """Endpoint pour déboguer les images d'articles"""
     try:
-        conn = get_db_connection()
-        
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            from database import get_mysql_cursor_with_names, convert_mysql_result
-            execute_with_names = get_mysql_cursor_with_names(conn)
-            
-            # Récupérer tous les articles
-            cur, column_names = execute_with_names("SELECT id, title, image_path FROM articles")
-            articles = cur.fetchall()
-            # Convertir les tuples MySQL en objets avec attributs nommés
-            articles = [convert_mysql_result(article, column_names) for article in articles]
-        else:
-            cur = conn.cursor()
-            cur.execute("SELECT id, title, image_path FROM articles")
-            articles = cur.fetchall()
-        
-        conn.close()
+        articles = await asyncio.to_thread(fetch_article_images_debug, max(1, min(limit, 1000)))
         
-        debug_info = []
-        for article in articles:
-            if hasattr(article, 'id'):
-                # MySQL
-                article_id = article.id
-                title = article.title
-                image_path = article.image_path
-            else:
-                # SQLite
-                article_id, title, image_path = article
-            
-            debug_info.append({
-                "id": article_id,
-                "title": title,
-                "image_path": image_path,
-                "image_path_type": type(image_path).__name__,
-                "image_path_length": len(str(image_path)) if image_path else 0,
-                "is_hostgator_url": str(image_path).startswith('https://www.cmtch.online') if image_path else False
-            })
+        debug_info = [
+            {
+                "id": article.id,
+                "title": article.title,
+                "image_path": article.image_path,
+                "image_path_type": type(article.image_path).__name__,
+                "image_path_length": article.image_path_length,
+                "is_hostgator_url": bool(article.is_hostgator_url),
+            }
+            for article in articles
+        ]
         
         return {
             "status": "success",
@@ -5805,83 +5419,39 @@ async def debug_article_images_endpoint():
             "message": f"Erreur lors du debug: {str(e)}"
         }
 
+def fix_article_images() -> Tuple[int, int]:
+    """Remplace les images invalides par l'image par défaut ; retourne (corrigés, total).
+
+    Fonction synchrone, appelée via asyncio.to_thread.
+    """
+    conn = get_db_connection()
+    try:
+        # Une seule requête remplace toutes les images manquantes ou invalides
+        cur = db_execute_write(conn, SQL_FIX_ARTICLE_IMAGES, (
+            PRODUCTION_DEFAULT_IMAGE_URL,
+            PRODUCTION_IMAGE_HOST + "%",
+            "%article_images%",
+            "%default_article.jpg",
+        ))
+        fixed_count = cur.rowcount
+        conn.commit()
+        rows, _ = db_execute(conn, "SELECT COUNT(*) AS total FROM articles")
+    finally:
+        conn.close()
+    return fixed_count, rows[0].total
+
+
 @app.get("/fix-production-images")
 async def fix_production_images_endpoint():
     """Endpoint pour corriger les images en production"""
     try:
-        conn = get_db_connection()
-        
-        # Vérifier si c'est une connexion MySQL
-        if hasattr(conn, '_is_mysql') and conn._is_mysql:
-            from database import get_mysql_cursor_with_names, convert_mysql_result
-            execute_with_names = get_mysql_cursor_with_names(conn)
-            
-            # Récupérer tous les articles
-            cur, column_names = execute_with_names("SELECT id, title, image_path FROM articles")
-            articles = cur.fetchall()
-            # Convertir les tuples MySQL en objets avec attributs nommés
-            articles = [convert_mysql_result(article, column_names) for article in articles]
-            
-            fixed_count = 0
-            
-            for article in articles:
-                article_id = article.id
-                title = article.title
-                image_path = article.image_path
-                
-                # Vérifier si l'image est manquante ou invalide
-                needs_fix = False
-                
-                if not image_path or image_path == '':
-                    needs_fix = True
-                elif not image_path.startswith('https://www.cmtch.online'):
-                    needs_fix = True
-                elif 'article_images' in image_path and not image_path.endswith('default_article.jpg'):
-                    needs_fix = True
-                
-                if needs_fix:
-                    # Utiliser l'image par défaut HostGator
-                    default_url = "https://www.cmtch.online/static/article_images/default_article.jpg"
-                    
-                    cur.execute("UPDATE articles SET image_path = %s WHERE id = %s", (default_url, article_id))
-                    conn.commit()
-                    fixed_count += 1
-        else:
-            # SQLite
-            cur = conn.cursor()
-            
-            # Récupérer tous les articles
-            cur.execute("SELECT id, title, image_path FROM articles")
-            articles = cur.fetchall()
-            
-            fixed_count = 0
-            
-            for article_id, title, image_path in articles:
-                # Vérifier si l'image est manquante ou invalide
-                needs_fix = False
-                
-                if not image_path or image_path == '':
-                    needs_fix = True
-                elif not image_path.startswith('https://www.cmtch.online'):
-                    needs_fix = True
-                elif 'article_images' in image_path and not image_path.endswith('default_article.jpg'):
-                    needs_fix = True
-                
-                if needs_fix:
-                    # Utiliser l'image par défaut HostGator
-                    default_url = "https://www.cmtch.online/static/article_images/default_article.jpg"
-                    
-                    cur.execute("UPDATE articles SET image_path = ? WHERE id = ?", (default_url, article_id))
-                    conn.commit()
-                    fixed_count += 1
-        
-        conn.close()
+        fixed_count, total_articles = await asyncio.to_thread(fix_article_images)
         
         return {
             "status": "success",
-            "message": f"Correction terminée: {fixed_count} articles corrigés sur {len(articles)}",
+            "message": f"Correction terminée: {fixed_count} articles corrigés sur {total_articles}",
             "fixed_count": fixed_count,
-            "total_articles": len(articles)
+            "total_articles": total_articles
         }
         
     except Exception as e:
@@ -5899,19 +5469,7 @@ async def force_disable_backup_endpoint():
         flag_file.touch()
         
         # Vérifier l'état actuel de la base
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        cur.execute("SELECT COUNT(*) FROM users")
-        users_count = cur.fetchone()[0]
-        
-        cur.execute("SELECT COUNT(*) FROM articles")
-        articles_count = cur.fetchone()[0]
-        
-        cur.execute("SELECT COUNT(*) FROM reservations")
-        reservations_count = cur.fetchone()[0]
-        
-        conn.close()
+        users_count, reservations_count, articles_count = await asyncio.to_thread(count_table_rows)
         
         return {
             "status": "success",
@@ -5939,19 +5497,7 @@ async def check_backup_status_endpoint():
         is_disabled = flag_file.exists()
         
         # Vérifier l'état de la base
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        cur.execute("SELECT COUNT(*) FROM users")
-        users_count = cur.fetchone()[0]
-        
-        cur.execute("SELECT COUNT(*) FROM articles")
-        articles_count = cur.fetchone()[0]
-        
-        cur.execute("SELECT COUNT(*) FROM reservations")
-        reservations_count = cur.fetchone()[0]
-        
-        conn.close()
+        users_count, reservations_count, articles_count = await asyncio.to_thread(count_table_rows)
         
         return {
             "status": "success",
@@ -5997,7 +5543,7 @@ async def create_admin_endpoint():
         
         # Créer l'utilisateur admin si la base est vide
         admin_password = "admin"
-        admin_password_hash = hash_password(admin_password)
+        admin_password_hash = await asyncio.to_thread(hash_password, admin_password)
         
         # Vérifier si c'est une connexion MySQL
         if hasattr(conn, '_is_mysql') and conn._is_mysql:
@@ -6041,8 +5587,8 @@ async def backup_database_endpoint(request: Request):
                 "message": "Accès refusé - droits administrateur requis"
             }
         
-        # Utiliser la fonction de sauvegarde existante
-        result = backup_database()
+        # Utiliser la fonction de sauvegarde existante (copie de fichiers, hors boucle d'événements)
+        result = await asyncio.to_thread(backup_database)
         
         return result
         
@@ -6123,18 +5669,8 @@ async def test_admin_reservations(request: Request):
         
         # Test de connexion à la base de données
         try:
-            conn = get_db_connection()
-            cur = conn.cursor()
-            
-            # Test de la table reservations
-            cur.execute("SELECT COUNT(*) FROM reservations")
-            reservations_count = cur.fetchone()[0]
-            
-            # Test de la table users
-            cur.execute("SELECT COUNT(*) FROM users")
-            users_count = cur.fetchone()[0]
-            
-            conn.close()
+            # Test des tables reservations et users
+            users_count, reservations_count, _ = await asyncio.to_thread(count_table_rows)
             
             return {
                 "status": "success",
@@ -6175,17 +5711,17 @@ async def test_espace_simple(request: Request) -> JSONResponse:
         # Test 1: Récupération du cookie
         token = request.cookies.get("session_token")
         if not token:
-            return JSONResponse({"error": "Aucun token de session trouvé"})
+            return FastJSONResponse({"error": "Aucun token de session trouvé"})
         
         # Test 2: Parsing du token
         user_id = parse_session_token(token)
         if not user_id:
-            return JSONResponse({"error": "Token de session invalide", "token": token})
+            return FastJSONResponse({"error": "Token de session invalide", "token": token})
         
         # Test 3: Récupération de l'utilisateur
         user = get_current_user(request)
         if not user:
-            return JSONResponse({"error": "get_current_user retourne None", "user_id": user_id})
+            return FastJSONResponse({"error": "get_current_user retourne None", "user_id": user_id})
         
         # Test 4: Vérification des attributs
         user_attrs = {}
@@ -6211,9 +5747,10 @@ async def test_espace_simple(request: Request) -> JSONResponse:
         
         # Test 5: Vérification du type d'objet
         user_type = type(user).__name__
-        user_dir = dir(user)
+        # La liste complète des attributs (plusieurs Ko) n'est renvoyée qu'en mode développement
+        user_dir = dir(user) if DEBUG else None
         
-        return JSONResponse({
+        return FastJSONResponse({
             "success": True,
             "token": token,
             "user_id": user_id,
@@ -6227,7 +5764,7 @@ async def test_espace_simple(request: Request) -> JSONResponse:
         
     except Exception as e:
         import traceback
-        return JSONResponse({
+        return FastJSONResponse({
             "error": str(e),
             "traceback": traceback.format_exc()
         })
\ No newline at end of file